@@ -0,0 +1,33 @@
+"""Checks that to_int/from_int scale linearly in the number of states.
+
+Usage: python benchmarks/codec.py [max_exponent]
+"""
+import sys
+import time
+
+from families import random_dfa
+
+from dfa import DFA
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(max_exponent=5):
+    print(f"{'states':>8} {'to_int (s)':>12} {'from_int (s)':>12} "
+          f"{'us/state':>10}")
+    for exponent in range(2, max_exponent + 1):
+        dfa_ = random_dfa(10**exponent)
+        n_states = len(dfa_.minimize().states())  # Exclude minimization.
+        encoding, encode_time = timed(dfa_.to_int)
+        _, decode_time = timed(DFA.from_int, encoding)
+        per_state = 1e6 * (encode_time + decode_time) / n_states
+        print(f"{n_states:>8} {encode_time:>12.4f} {decode_time:>12.4f} "
+              f"{per_state:>10.2f}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,86 @@
+"""Reproducible families of DFAs for benchmarking.
+
+Each family maps (n_states, n_inputs, seed) to a fresh DFA with (about)
+n_states reachable states over the letters range(n_inputs). Calling a
+family twice with the same arguments yields equal DFAs that share no
+caches.
+"""
+import math
+import random
+
+from dfa import DFA
+from dfa.utils import dict2dfa
+
+
+def random_dfa(n_states, n_inputs=2, seed=0):
+    """Explicit DFA with uniformly random transitions and labels."""
+    rng = random.Random(seed)
+    dfa_dict = {s: (
+        rng.random() < 0.5,
+        {a: rng.randrange(n_states) for a in range(n_inputs)},
+    ) for s in range(n_states)}
+    return dict2dfa(dfa_dict, start=0, outputs={True, False})
+
+
+def counter(n_states, n_inputs=2, seed=0):
+    """Counts the sum of the letters modulo n_states."""
+    return DFA(
+        start=seed % n_states,
+        inputs=range(n_inputs),
+        label=lambda s: s == 0,
+        transition=lambda s, c: (s + c + 1) % n_states,
+    )
+
+
+def implicit(n_states, n_inputs=2, seed=0):
+    """Lambda DFA with pseudo random (affine) transitions."""
+    scale = 2 * random.Random(seed).randrange(n_states) + 1
+    return DFA(
+        start=0,
+        inputs=range(n_inputs),
+        label=lambda s: s % 3 == 0,
+        transition=lambda s, c: (scale * s + c + 1) % n_states,
+    )
+
+
+PRIMES = (2, 3, 5, 7, 11, 13)
+
+
+def product(n_states, n_inputs=2, seed=0):
+    """Intersection of small counters with pairwise coprime moduli.
+
+    The reachable states are all combinations of counter values, i.e.,
+    the product of the moduli (at most, and close to, n_states).
+    """
+    moduli, size = [], 1
+    for prime in PRIMES:
+        if size * prime * prime > n_states:
+            break
+        moduli.append(prime)
+        size *= prime
+    last = max(n_states // size, 1)
+    while math.gcd(last, size) != 1:
+        last -= 1
+    if last > 1:
+        moduli.append(last)
+
+    def count_mod(modulus):
+        return DFA(
+            start=seed % modulus,
+            inputs=range(n_inputs),
+            label=lambda s: s != 1,
+            transition=lambda s, c: (s + c + 1) % modulus,
+        )
+
+    result = count_mod(moduli[0]) if moduli else count_mod(1)
+    for modulus in moduli[1:]:
+        result &= count_mod(modulus)
+    return result
+
+
+FAMILIES = {
+    'random': random_dfa,
+    'counter': counter,
+    'implicit': implicit,
+    'product': product,
+}
@@ -0,0 +1,170 @@
+"""Times core DFA operations on generated families of DFAs.
+
+Usage:
+    python benchmarks/run.py [--sizes 10 1000] [--inputs 2 16 256]
+                             [--save results.json] [--compare base.json]
+
+Results are stored as JSON mapping "family/states/inputs/operation" to
+the best time (in seconds) over a few repetitions. Comparing against a
+saved baseline reports the operations that got slower than the given
+threshold and exits with status 1 if there are any.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from families import FAMILIES
+
+from dfa import DFA, dfa2dict, dict2dfa
+
+
+NUM_LABEL_LETTERS = 10_000
+MIN_SECONDS = 1e-3  # Faster timings are too noisy to compare.
+
+
+def operations(build, path):
+    """Yields (name, setup) pairs. Setup returns the thunk to time.
+
+    Setup gets a fresh DFA, so that timings never include results cached
+    by earlier operations.
+    """
+    yield 'states', lambda d: d.states
+    yield 'minimize', lambda d: d.minimize
+    yield 'eq', lambda d: (lambda d2: lambda: d == d2)(build())
+    yield 'hash', lambda d: d.__hash__
+    yield 'to_int', lambda d: d.to_int
+
+    def from_int(d):
+        inputs = sorted(d.inputs)
+        encoding = d.to_int(inputs)
+        return lambda: DFA.from_int(encoding, inputs)
+    yield 'from_int', from_int
+
+    def label(d):
+        letters = list(d.inputs)
+        rng = random.Random(0)
+        word = [rng.choice(letters) for _ in range(NUM_LABEL_LETTERS)]
+        return lambda: d.label(word)
+    yield 'label', label
+
+    yield 'dfa2dict', lambda d: lambda: dfa2dict(d)
+
+    def from_dict(d):
+        dfa_dict, start = dfa2dict(d)
+        return lambda: dict2dfa(dfa_dict, start).states()
+    yield 'dict2dfa', from_dict
+
+    try:
+        from dfa.draw import write_dot
+    except ImportError:  # Optional dependency missing.
+        return
+    yield 'write_dot', lambda d: lambda: write_dot(d, path)
+
+
+def best_time(thunk_factory, build, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        thunk = thunk_factory(build())
+        start = time.perf_counter()
+        thunk()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(families, sizes, inputs, max_cells, repeat, verbose=True):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dfa.dot')
+        for name in families:
+            for n_states in sizes:
+                for n_inputs in inputs:
+                    if n_states * n_inputs > max_cells:
+                        continue
+
+                    def build():
+                        return FAMILIES[name](n_states, n_inputs)
+
+                    reps = repeat if n_states * n_inputs <= 10**5 else 1
+                    for op, setup in operations(build, path):
+                        key = f"{name}/{n_states}/{n_inputs}/{op}"
+                        results[key] = best_time(setup, build, reps)
+                        if verbose:
+                            print(f"{key:<40} {results[key]:>10.4f}s",
+                                  flush=True)
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Returns (key, old, new) for operations slower than threshold."""
+    slower = []
+    for key, new in sorted(results.items()):
+        old = baseline.get(key)
+        if old is None or max(old, new) < MIN_SECONDS:
+            continue
+        if new > threshold * old:
+            slower.append((key, old, new))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--families', nargs='+', default=list(FAMILIES),
+                        choices=list(FAMILIES))
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[10, 100, 1000, 10_000])
+    parser.add_argument('--inputs', nargs='+', type=int, default=[2, 16, 256])
+    parser.add_argument('--max-cells', type=int, default=10**6,
+                        help="Skip DFAs with more than states x inputs.")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help="Write results to this JSON file.")
+    parser.add_argument('--compare', help="Baseline JSON file.")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Slowdown ratio reported as regression.")
+    args = parser.parse_args(argv)
+
+    results = run(args.families, args.sizes, args.inputs, args.max_cells,
+                  args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2,
+                      sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slower = compare(results, baseline['results'], args.threshold)
+        commit = baseline['meta'].get('commit')
+        print(f"\nCompared to baseline {commit or args.compare}:")
+        for key, old, new in slower:
+            print(f"{key:<40} {old:>10.4f}s -> {new:>10.4f}s "
+                  f"({new / old:.2f}x)")
+        if not slower:
+            print("No slowdowns.")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
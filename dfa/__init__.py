@@ -1,6 +1,11 @@
 # flake8: noqa
+import importlib
+from typing import TYPE_CHECKING
+
 from dfa.dfa import DFA, State, Letter, Alphabet
-from dfa.utils import DFADict, dfa2dict, dict2dfa
+
+if TYPE_CHECKING:
+    from dfa.utils import DFADict, dfa2dict, dict2dfa
 
 __all__ = [
     'Alphabet',
@@ -11,3 +16,23 @@ __all__ = [
     'dfa2dict',
     'dict2dfa',
 ]
+
+_LAZY = {'DFADict', 'dfa2dict', 'dict2dfa'}  # Defined in dfa.utils.
+
+
+def __getattr__(name):
+    # Load dfa.utils (and its dependencies) on first use.
+    if name in _LAZY:
+        from dfa import utils
+        return getattr(utils, name)
+    if not name.startswith('_'):  # Submodules, e.g., dfa.utils.
+        try:
+            return importlib.import_module(f'dfa.{name}')
+        except ModuleNotFoundError as exc:
+            if exc.name != f'dfa.{name}':
+                raise  # Missing dependency of an existing submodule.
+    raise AttributeError(f"module 'dfa' has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY)
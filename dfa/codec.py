@@ -0,0 +1,164 @@
+"""Integer encoding of Boolean DFAs.
+
+The encoding is a bit string (read as an integer) with the format:
+
+1. A leading 1 (so leading zeros are not lost).
+2. Zero delimited unary encoding of the number of bits needed for
+   states, followed by |states| - 1 in binary.
+3. The same for the inputs.
+4. A bit specifying whether the accepting (0) or rejecting (1) states
+   are listed, followed by the number of listed states - 1 and then
+   the listed states.
+5. All non-stuttering transitions as (start, letter index, end)
+   triples.
+
+Encoding and decoding run in time linear in the size of the encoding.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from dfa.dfa import DFA, OrderedAlphabet, bits_needed
+
+
+def _fmt(width: int):
+    """Returns a function writing integers using exactly width bits."""
+    if width == 0:
+        return lambda _: ''
+    return lambda x: format(x, f'0{width}b')
+
+
+def encode(dfa_: DFA, input_order: OrderedAlphabet | None = None) -> int:
+    """Encodes the language of a Boolean DFA as an integer."""
+    from dfa.utils import tabulate
+
+    if not (dfa_.outputs <= {True, False}):
+        raise ValueError('Integer encoding only defined for Boolean DFAs.')
+    if input_order is None:
+        input_order = sorted(dfa_.inputs)  # TypeError if unsortable.
+    elif set(input_order) != dfa_.inputs:
+        raise ValueError('Input order does not match inputs.')
+    _, inputs, table, labels = tabulate(dfa_._canonicalize())
+    col = {a: i for i, a in enumerate(inputs)}
+    perm = [col[a] for a in input_order]
+
+    n_states = len(table)
+    state_bits = bits_needed(n_states)
+    input_bits = bits_needed(len(input_order))
+    state, sym = _fmt(state_bits), _fmt(input_bits)
+
+    parts = ['1']  # Start with 1 for int conversion.
+    parts.append('1' * state_bits + '0')
+    parts.append(state(n_states - 1))
+    parts.append('1' * input_bits + '0')
+    parts.append(sym(len(input_order) - 1))
+
+    # Specify accepting (or rejecting set).
+    accepting = {s for s in range(n_states) if labels[s]}
+    specify_rejecting = len(accepting) * 2 >= n_states + 1
+    indicies = set(range(n_states)) - accepting if specify_rejecting \
+        else accepting
+
+    parts.append('1' if specify_rejecting else '0')
+    if state_bits:
+        parts.append(state(len(indicies) - 1))
+    parts.extend(map(state, indicies))
+
+    for start, row in enumerate(table):
+        start_bits = state(start)
+        for i, c in enumerate(perm):
+            end = row[c]
+            if start == end:
+                continue
+            parts.append(start_bits)
+            parts.append(sym(i))
+            parts.append(state(end))
+    return int(''.join(parts), 2)
+
+
+class _Reader:
+    """Cursor over a bit string."""
+
+    def __init__(self, encoding: int):
+        self.bits = format(encoding, 'b')
+        self.pos = 1  # Ignore leading 1.
+
+    def done(self) -> bool:
+        return self.pos >= len(self.bits)
+
+    def read(self, width: int) -> int:
+        if width == 0:
+            return 0
+        pos, self.pos = self.pos, self.pos + width
+        return int(self.bits[pos:self.pos], 2)
+
+    def read_unary(self) -> int:
+        idx = self.bits.index('0', self.pos)
+        count, self.pos = idx - self.pos, idx + 1
+        return count
+
+
+def decode(encoding: int, inputs: OrderedAlphabet | None = None) -> DFA:
+    """Decodes an integer produced by encode into a DFA."""
+    reader = _Reader(encoding)
+
+    # Parse state and input bits info.
+    state_bits = reader.read_unary()
+    n_states = reader.read(state_bits) + 1
+    input_bits = reader.read_unary()
+    n_inputs = reader.read(input_bits) + 1
+    if inputs is not None:
+        assert n_inputs == len(inputs)
+    else:
+        inputs = range(n_inputs)
+
+    # Specify accepting or rejecting set convention.
+    specify_rejecting = bool(reader.read(1))
+
+    if reader.done():  # Must be a single state DFA.
+        assert n_states == 1
+        return DFA(
+            start=specify_rejecting,
+            inputs=inputs,
+            transition=lambda *_: specify_rejecting,
+            label=lambda _: specify_rejecting,
+        )
+    n_accepting = reader.read(state_bits) + 1
+    accepting = {reader.read(state_bits) for _ in range(n_accepting)}
+
+    # Remaining bits are non-stuttering transitions.
+    transitions = {}
+    while not reader.done():
+        start = reader.read(state_bits)
+        sym = inputs[reader.read(input_bits)]
+        transitions[start, sym] = reader.read(state_bits)
+
+    return DFA(
+        start=0,
+        inputs=inputs,
+        label=lambda s: (s in accepting) ^ specify_rejecting,
+        transition=lambda s, c: transitions.get((s, c), s),
+    )
+
+
+def to_ints(dfas: Iterable[DFA],
+            input_order: OrderedAlphabet | None = None) -> list[int]:
+    """Encodes many DFAs, ordering shared alphabets only once."""
+    orders = {}
+    encodings = []
+    for dfa_ in dfas:
+        order = input_order
+        if order is None:
+            if dfa_.inputs not in orders:
+                orders[dfa_.inputs] = sorted(dfa_.inputs)
+            order = orders[dfa_.inputs]
+        encodings.append(encode(dfa_, order))
+    return encodings
+
+
+def from_ints(encodings: Iterable[int],
+              inputs: OrderedAlphabet | None = None) -> list[DFA]:
+    """Decodes many DFAs sharing the given inputs."""
+    if inputs is not None:
+        inputs = tuple(inputs)
+    return [decode(encoding, inputs) for encoding in encodings]
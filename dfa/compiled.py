@@ -0,0 +1,372 @@
+"""Dense transition table representation of explicit DFAs."""
+from __future__ import annotations
+
+import operator
+from typing import Iterable, Optional, Sequence, TYPE_CHECKING
+
+import attr
+import numpy as np
+
+from dfa.dfa import DFA, State, Letter, Alphabet, ordered
+
+if TYPE_CHECKING:
+    from dfa.graph import GraphIndex
+
+
+def label_array(labels: list, outputs: Alphabet) -> np.ndarray:
+    """Packs labels into a bool array if possible and an object array o.w."""
+    if outputs <= {True, False}:
+        return np.array(labels, dtype=bool).reshape(len(labels))
+    array = np.empty(len(labels), dtype=object)
+    for i, label in enumerate(labels):  # Avoid numpy unpacking tuples.
+        array[i] = label
+    return array
+
+
+def align(offset: int) -> int:
+    """Rounds offset up to a multiple of 8 (for binary table layouts)."""
+    return -(-offset // 8) * 8
+
+
+def pack_labels(compiled: CompiledDFA) -> tuple[list, np.ndarray]:
+    """Returns the outputs and the labels as small ints for storage.
+
+    Boolean labels become uint8s. Other labels become int32 indices into
+    the returned outputs. See unpack_labels.
+    """
+    if compiled.labels.dtype == bool:
+        return sorted(compiled.outputs), compiled.labels.astype(np.uint8)
+    outputs = list(compiled.outputs)
+    outputs.extend(set(compiled.labels) - compiled.outputs)
+    index = {o: i for i, o in enumerate(outputs)}
+    labels = np.fromiter(map(index.__getitem__, compiled.labels),
+                         dtype='<i4', count=len(compiled.labels))
+    return outputs, labels
+
+
+def unpack_labels(labels: np.ndarray, outputs) -> np.ndarray:
+    """Inverse of pack_labels. Boolean labels are viewed, not copied."""
+    if labels.dtype == np.uint8:
+        return labels.view(bool)
+    return label_array(list(outputs), frozenset(outputs))[labels]
+
+
+@attr.frozen
+class _Identity:
+    """Index lookup for states that are already indices."""
+    states: range
+
+    def __getitem__(self, state):
+        try:
+            return self.states.index(state)
+        except ValueError:
+            raise KeyError(state) from None
+
+
+@attr.frozen(eq=False)
+class CompiledDFA:
+    """Explicit DFA with states and letters replaced by integer indices.
+
+    - table[s, i] is the index of the state reached from state index s
+      by reading the i-th letter of inputs.
+    - labels[s] is the label of state index s.
+    - states[s] is the original state with index s. May be a range if
+      the states are the indices themselves.
+    """
+    start: int
+    table: np.ndarray
+    labels: np.ndarray
+    states: Sequence[State]
+    inputs: tuple[Letter, ...]
+    outputs: Alphabet = attr.ib(converter=frozenset)
+    letter2col: dict[Letter, int] = attr.ib(init=False, repr=False)
+    state2idx: dict[State, int] = attr.ib(init=False, repr=False)
+    _graph: Optional[GraphIndex] = attr.ib(default=None, init=False,
+                                           repr=False)
+    _sinks: Optional[np.ndarray] = attr.ib(default=None, init=False,
+                                           repr=False)
+
+    @letter2col.default
+    def _letter2col(self):
+        return {a: i for i, a in enumerate(self.inputs)}
+
+    @state2idx.default
+    def _state2idx(self):
+        if self.states == range(len(self.states)):
+            return _Identity(self.states)  # Avoid materializing states.
+        return {s: i for i, s in enumerate(self.states)}
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def graph(self) -> GraphIndex:
+        """Returns the (cached) reverse transition index and analytics."""
+        if self._graph is None:
+            from dfa.graph import GraphIndex
+            object.__setattr__(self, "_graph", GraphIndex(self))
+        return self._graph
+
+    def _start(self, start: Optional[State]) -> int:
+        return self.start if start is None else self.state2idx[start]
+
+    @property
+    def sinks(self) -> np.ndarray:
+        """Mask of the absorbing states, i.e., only self loops."""
+        if self._sinks is None:
+            table = self.table
+            sinks = (table == np.arange(len(table))[:, None]).all(axis=1)
+            object.__setattr__(self, "_sinks", sinks)
+        return self._sinks
+
+    def index_trace(self, word, *, start: Optional[State] = None):
+        """Like trace, but yields state indices."""
+        state = self._start(start)
+        yield state
+
+        lookup, col = self.table.item, self.letter2col.__getitem__
+        is_sink = self.sinks.item
+        word = iter(word)
+        for char in word:
+            state2 = lookup(state, col(char))
+            yield state2
+            if state2 == state and is_sink(state):
+                break
+            state = state2
+
+        for _ in word:  # Absorbed. No need to look up transitions.
+            yield state
+
+    def index_transition(self, word, *, start: Optional[State] = None) -> int:
+        """Like transition, but returns a state index.
+
+        Stops reading word once an absorbing (sink) state is reached.
+        """
+        state = self._start(start)
+        lookup, col = self.table.item, self.letter2col.__getitem__
+        is_sink = self.sinks.item
+        for char in word:
+            state2 = lookup(state, col(char))
+            if state2 == state and is_sink(state):
+                break
+            state = state2
+        return state
+
+    def trace(self, word, *, start: Optional[State] = None):
+        yield from map(self.states.__getitem__,
+                       self.index_trace(word, start=start))
+
+    def transition(self, word, *, start: Optional[State] = None) -> State:
+        return self.states[self.index_transition(word, start=start)]
+
+    def label(self, word, *, start: Optional[State] = None) -> Letter:
+        return self.labels.item(self.index_transition(word, start=start))
+
+    def transduce(self, word, *, start: Optional[State] = None):
+        trace = list(self.index_trace(word, start=start))[:-1]
+        return tuple(self.labels[trace].tolist())
+
+    def encode_words(self, words) -> tuple[np.ndarray, np.ndarray]:
+        """Pads words into a 2-D array of letter indices.
+
+        Returns the (len(words), max length) int32 array and the
+        length of each word.
+        """
+        words = list(words)
+        lengths = np.fromiter(map(len, words), dtype=np.int64,
+                              count=len(words))
+        cols = np.zeros((len(words), lengths.max(initial=0)), dtype=np.int32)
+        col = self.letter2col.__getitem__
+        for i, word in enumerate(words):
+            cols[i, :len(word)] = [col(char) for char in word]
+        return cols, lengths
+
+    def transition_batch(self, words, lengths=None, *,
+                         start: Optional[State] = None) -> np.ndarray:
+        """Computes the final state index of many words in lock-step.
+
+        words is either a list of words or a padded 2-D integer array
+        of letter indices (see encode_words). In the latter case,
+        lengths gives the length of each row and defaults to the row
+        width.
+        """
+        if isinstance(words, np.ndarray):
+            cols = words
+            if cols.ndim != 2:
+                raise ValueError("Expected a 2-D array of letter indices.")
+            if lengths is None:
+                lengths = np.full(len(cols), cols.shape[1])
+        else:
+            cols, lengths = self.encode_words(words)
+        lengths = np.asarray(lengths)
+
+        # Sort by decreasing length so active words form a prefix.
+        order = np.argsort(-lengths, kind='stable')
+        cols, lengths = cols[order], lengths[order]
+        n_active = np.searchsorted(-lengths, -np.arange(cols.shape[1]),
+                                   side='left')
+
+        states = np.full(len(cols), self._start(start), dtype=np.int32)
+        for i, n in enumerate(n_active):
+            states[:n] = self.table[states[:n], cols[:n, i]]
+
+        result = np.empty_like(states)
+        result[order] = states
+        return result
+
+    def label_batch(self, words, lengths=None, *,
+                    start: Optional[State] = None) -> np.ndarray:
+        """Labels many words in lock-step. See transition_batch."""
+        return self.labels[self.transition_batch(words, lengths, start=start)]
+
+    def to_dfa(self) -> DFA:
+        """Returns a DFA backed by this table.
+
+        The returned DFA's compile method returns this object.
+        """
+        states, table, labels = self.states, self.table, self.labels
+        col, idx = self.letter2col, self.state2idx
+        dfa_ = DFA(
+            start=states[self.start],
+            inputs=self.inputs,
+            outputs=self.outputs,
+            label=lambda s: labels.item(idx[s]),
+            transition=lambda s, c: states[table.item(idx[s], col[c])],
+        )
+        object.__setattr__(dfa_, "_compiled", self)
+        return dfa_
+
+
+def compile_dfa(dfa_: DFA) -> CompiledDFA:
+    """Explores dfa_ once and tabulates its transitions and labels."""
+    assert dfa_.inputs is not None, "Need to specify inputs field!"
+    dfa_.states()  # Explicitly compute states.
+    states = dfa_._states
+    inputs = tuple(ordered(dfa_.inputs))
+    index = {s: i for i, s in enumerate(states)}
+
+    transitions: Iterable[int] = (
+        index[dfa_._transition(s, a)] for s in states for a in inputs
+    )
+    table = np.fromiter(transitions, dtype=np.int32,
+                        count=len(states) * len(inputs))
+    labels = label_array([dfa_._label(s) for s in states], dfa_.outputs)
+
+    return CompiledDFA(
+        start=index[dfa_.start],
+        table=table.reshape(len(states), len(inputs)),
+        labels=labels,
+        states=states,
+        inputs=inputs,
+        outputs=dfa_.outputs,
+    )
+
+
+# A dense pair -> index map is used for at most DENSE_PRODUCT_LIMIT pairs
+# and DENSE_PRODUCT_RATIO pairs per reachable pair.
+DENSE_PRODUCT_LIMIT = 1 << 24
+DENSE_PRODUCT_RATIO = 16
+
+
+def _unseen(ids, codes: np.ndarray, n_seen: int) -> np.ndarray:
+    """Numbers new codes from n_seen on, in order of first occurrence.
+
+    ids maps codes to indices. It is a dict or an array (-1 if unseen).
+    """
+    if isinstance(ids, dict):
+        codes = [c for c in dict.fromkeys(codes.tolist()) if c not in ids]
+        ids.update(zip(codes, range(n_seen, n_seen + len(codes))))
+        return np.array(codes, dtype=np.int64)
+    codes = codes[ids[codes] < 0]
+    # Deduplicate, keeping first occurrences.
+    _, first = np.unique(codes, return_index=True)
+    codes = codes[np.sort(first)]
+    ids[codes] = np.arange(n_seen, n_seen + len(codes))
+    return codes
+
+
+def _index(ids, codes: np.ndarray) -> np.ndarray:
+    if isinstance(ids, dict):
+        return np.fromiter(map(ids.__getitem__, codes.tolist()),
+                           dtype=np.int64, count=len(codes))
+    return ids[codes]
+
+
+def _label_op(op, left: np.ndarray, right: np.ndarray, outputs) -> np.ndarray:
+    if left.dtype == right.dtype == bool and \
+       op in (operator.and_, operator.or_, operator.xor):
+        return op(left, right)
+    labels = np.frompyfunc(op, 2, 1)(left, right)
+    return label_array(list(labels), outputs)
+
+
+def product(left: CompiledDFA, right: CompiledDFA, op, *,
+            minimize: bool = False) -> CompiledDFA:
+    """Synchronous product of two compiled DFAs with labels combined by op.
+
+    Only reachable pairs of states are computed. Pairs are explored in
+    breadth first order, one level at a time using array operations, and
+    renumbered densely. If minimize is True, the result is minimized.
+    """
+    if set(left.inputs) != set(right.inputs):
+        raise ValueError(f"{op} requires shared inputs.")
+    perm = [right.letter2col[a] for a in left.inputs]
+    table_l, table_r = left.table, right.table[:, perm]
+    n_right = np.int64(len(right))
+
+    # Reachable pairs are usually a small fraction of all pairs, so pairs
+    # are numbered with a dict. Once enough pairs have been seen, switch
+    # to a dense array, which is faster and no larger.
+    n_pairs = len(left) * len(right)
+    start = int(left.start * n_right + right.start)
+    ids, frontier = {start: 0}, np.array([start], dtype=np.int64)
+    levels, successors, n_seen = [], [], 1
+    while len(frontier):
+        if isinstance(ids, dict) and n_pairs <= min(
+                DENSE_PRODUCT_LIMIT, DENSE_PRODUCT_RATIO * n_seen):
+            codes = np.concatenate(levels + [frontier])
+            ids = np.full(n_pairs, -1, dtype=np.int32)
+            ids[codes] = np.arange(n_seen)
+        levels.append(frontier)
+        succ = table_l[frontier // n_right].astype(np.int64) * n_right \
+            + table_r[frontier % n_right]
+        successors.append(succ)
+        frontier = _unseen(ids, succ.ravel(), n_seen)
+        n_seen += len(frontier)
+
+    codes = np.concatenate(levels)
+    table = _index(ids, np.concatenate(successors).ravel())
+    outputs = left.outputs | right.outputs
+    labels = _label_op(op, left.labels[codes // n_right],
+                       right.labels[codes % n_right], outputs)
+    result = CompiledDFA(
+        start=0,
+        table=table.astype(np.int32).reshape(len(codes), len(left.inputs)),
+        labels=labels,
+        states=range(len(codes)),
+        inputs=left.inputs,
+        outputs=outputs,
+    )
+    return quotient(result) if minimize else result
+
+
+def quotient(compiled: CompiledDFA) -> CompiledDFA:
+    """Merges equivalent states of a compiled DFA.
+
+    Blocks are numbered in order of their first state.
+    """
+    from dfa.utils import partition
+
+    block = np.array(partition(compiled.table.tolist(),
+                               compiled.labels.tolist()), dtype=np.int32)
+    _, reps = np.unique(block, return_index=True)
+    reps.sort()  # Number blocks by first occurrence.
+    renumber = np.empty(len(reps), dtype=np.int32)
+    renumber[block[reps]] = np.arange(len(reps), dtype=np.int32)
+    return CompiledDFA(
+        start=int(renumber[block[compiled.start]]),
+        table=renumber[block[compiled.table[reps]]],
+        labels=compiled.labels[reps],
+        states=range(len(reps)),
+        inputs=compiled.inputs,
+        outputs=compiled.outputs,
+    )
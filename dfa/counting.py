@@ -0,0 +1,155 @@
+"""Counting, ranking and uniform sampling of words in a DFA.
+
+Counts are computed by dynamic programming over the compiled transition
+table. The number of words of length n leading from state s into a
+target set is
+
+    count[0][s] = 1 if s is a target else 0
+    count[n + 1][s] = sum(count[n][t] for t in table[s])
+
+Counts use int64 arrays while they provably fit and python integers
+afterwards, or optionally arithmetic modulo a given number.
+"""
+from __future__ import annotations
+
+import random
+from typing import Optional, Union
+
+import numpy as np
+
+from dfa.dfa import DFA, Letter, Word
+from dfa.compiled import CompiledDFA
+
+
+Rng = Union[random.Random, int, None]
+INT64_BOUND = 1 << 62
+
+
+def as_rng(rng: Rng) -> random.Random:
+    """Returns rng if it is a random.Random, o.w., seeds a new one."""
+    return rng if isinstance(rng, random.Random) else random.Random(rng)
+
+
+class PathCounter:
+    """Counts words leading from each state into a set of target states.
+
+    Counts for each length are computed on demand and kept.
+    """
+
+    def __init__(self, compiled: CompiledDFA, targets: np.ndarray,
+                 modulus: Optional[int] = None):
+        self.compiled = compiled
+        self.modulus = modulus
+        n_inputs = max(len(compiled.inputs), 1)
+        if modulus is not None and modulus * n_inputs >= INT64_BOUND:
+            raise ValueError("Modulus too large for int64 arithmetic.")
+        self._counts = [np.asarray(targets, dtype=np.int64)]
+        self._bound = 1  # Upper bound on the latest counts.
+
+    def counts(self, length: int) -> np.ndarray:
+        """Number of words of the given length from each state."""
+        table, n_inputs = self.compiled.table, len(self.compiled.inputs)
+        while len(self._counts) <= length:
+            prev = self._counts[-1]
+            if prev.dtype != object and self.modulus is None:
+                self._bound *= n_inputs
+                if self._bound >= INT64_BOUND:  # Switch to big ints.
+                    prev = prev.astype(object)
+            curr = prev[table].sum(axis=1, dtype=prev.dtype)
+            if self.modulus is not None:
+                curr %= self.modulus
+            self._counts.append(curr)
+        return self._counts[length]
+
+    def count(self, state: int, length: int) -> int:
+        return int(self.counts(length)[state])
+
+    def _require_exact(self):
+        if self.modulus is not None:
+            raise ValueError("Ranking requires exact (non-modular) counts.")
+
+    def unrank(self, state: int, length: int, rank: int) -> Word:
+        """Returns the rank-th word (in lexicographic order) of the given
+        length leading from state into the targets."""
+        self._require_exact()
+        if not 0 <= rank < self.count(state, length):
+            raise IndexError("Rank out of range.")
+        table, inputs = self.compiled.table, self.compiled.inputs
+        word = []
+        for remaining in range(length - 1, -1, -1):
+            counts = self.counts(remaining)
+            for i, succ in enumerate(table[state].tolist()):
+                count = int(counts[succ])
+                if rank < count:
+                    break
+                rank -= count
+            word.append(inputs[i])
+            state = succ
+        return tuple(word)
+
+    def rank(self, state: int, word: Word) -> int:
+        """Inverse of unrank."""
+        self._require_exact()
+        table, col = self.compiled.table, self.compiled.letter2col
+        rank = 0
+        for remaining, char in zip(range(len(word) - 1, -1, -1), word):
+            counts = self.counts(remaining)
+            row = table[state]
+            rank += int(sum(counts[row[:col[char]]].tolist()))
+            state = int(row[col[char]])
+        if not self.counts(0)[state]:
+            raise ValueError("Word does not reach a target state.")
+        return rank
+
+    def sample(self, state: int, length: int, rng: Rng = None) -> Word:
+        """Draws a word of the given length uniformly at random."""
+        total = self.count(state, length)
+        if total == 0:
+            raise ValueError(f"No words of length {length}.")
+        return self.unrank(state, length, as_rng(rng).randrange(total))
+
+
+class WordCounter:
+    """Counts, ranks and uniformly samples words with a given label.
+
+    Words are ordered first by length, then lexicographically using the
+    order of compiled.inputs.
+    """
+
+    def __init__(self, dfa_: DFA | CompiledDFA, label: Letter = True,
+                 modulus: Optional[int] = None):
+        compiled = dfa_.compile() if isinstance(dfa_, DFA) else dfa_
+        self.compiled = compiled
+        self.paths = PathCounter(compiled, compiled.labels == label, modulus)
+
+    def count(self, length: int) -> int:
+        """Number of words of the given length."""
+        return self.paths.count(self.compiled.start, length)
+
+    def count_words(self, max_length: int) -> list[int]:
+        """Number of words of each length up to (and including) max_length."""
+        return [self.count(n) for n in range(max_length + 1)]
+
+    def unrank(self, length: int, rank: int) -> Word:
+        return self.paths.unrank(self.compiled.start, length, rank)
+
+    def rank(self, word: Word) -> int:
+        return self.paths.rank(self.compiled.start, word)
+
+    def sample(self, length: int, num_samples: int = 1,
+               rng: Rng = None) -> list[Word]:
+        """Draws words of the given length uniformly (with replacement)."""
+        rng = as_rng(rng)
+        total = self.count(length)
+        if total == 0:
+            raise ValueError(f"No words of length {length}.")
+        return [self.unrank(length, rng.randrange(total))
+                for _ in range(num_samples)]
+
+
+def count_words(dfa_: DFA | CompiledDFA, max_length: int, *,
+                label: Letter = True,
+                modulus: Optional[int] = None) -> list[int]:
+    """Number of words with the given label of each length up to
+    max_length."""
+    return WordCounter(dfa_, label, modulus).count_words(max_length)
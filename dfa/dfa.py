@@ -1,11 +1,19 @@
 from __future__ import annotations
 
 import operator
-from functools import cache, wraps
+from collections import Counter
+from functools import partial, wraps
 from typing import Hashable, FrozenSet, Callable, Optional, Sequence, Iterable
+from typing import TYPE_CHECKING
 
 import attr
-import funcy as fn
+
+from dfa.memo import memoize
+from dfa.stats import timed
+
+if TYPE_CHECKING:
+    from dfa.compiled import CompiledDFA
+    from dfa.progression import Progressions
 
 State = Hashable
 Letter = Hashable
@@ -27,6 +35,29 @@ def bits_needed(n: int) -> int:
     return 0 if n < 2 else len(bin(n - 1)) - 2
 
 
+def ordered(inputs: Alphabet) -> OrderedAlphabet:
+    """Deterministically orders an alphabet."""
+    try:
+        return sorted(inputs)  # Try to respect inherent order.
+    except TypeError:
+        return sorted(inputs, key=id)  # Fall back on object ids.
+
+
+def sortable(inputs: Alphabet) -> bool:
+    """Whether ordered(inputs) is independent of object ids."""
+    try:
+        sorted(inputs)
+    except TypeError:
+        return False
+    return True
+
+
+def _sink_test(transition, inputs: Alphabet) -> Callable[[State], bool]:
+    def is_sink(state):
+        return all(transition(state, a) == state for a in inputs)
+    return is_sink
+
+
 def evolve(d: DFA, *args, **kwargs) -> DFA:
     kwargs.setdefault('states', None)
     kwargs.setdefault('hash', None)
@@ -37,10 +68,10 @@ def evolve(d: DFA, *args, **kwargs) -> DFA:
 class DFA:
     start: State
     _label: Callable[[State], Letter] = attr.ib(
-        converter=cache
+        converter=partial(memoize, kind='label')
     )
     _transition: Callable[[State, Letter], State] = attr.ib(
-        converter=cache
+        converter=partial(memoize, kind='transition')
     )
     inputs: Optional[Alphabet] = attr.ib(
         converter=lambda x: x if x is None else frozenset(x), default=None
@@ -48,6 +79,18 @@ class DFA:
     outputs: Alphabet = attr.ib(converter=frozenset, default={True, False})
     _states: Optional[Sequence[State]] = None
     _hash: Optional[int] = None
+    _compiled: Optional[CompiledDFA] = attr.ib(
+        default=None, init=False, repr=False, eq=False
+    )
+    _canonical: Optional[DFA] = attr.ib(
+        default=None, init=False, repr=False, eq=False
+    )
+    _sinks: Optional[Callable[[State], bool]] = attr.ib(
+        default=None, init=False, repr=False, eq=False
+    )
+    _progressions: Optional[Progressions] = attr.ib(
+        default=None, init=False, repr=False, eq=False
+    )
 
     def __repr__(self) -> int:
         from dfa.utils import dfa2dict
@@ -63,155 +106,74 @@ class DFA:
         """Normalizes the state indexing and memoizes transitions/labels."""
         from dfa.utils import dfa2dict
         from dfa.utils import dict2dfa
+
+        canonical = self._canonical
+        if canonical is not None and \
+           len(canonical.states()) == len(self.states()):
+            return canonical  # Already minimal, so normal form coincides.
         return dict2dfa(*dfa2dict(self, reindex=True))
 
     def minimize(self) -> DFA:
-        from dfa.utils import minimize
-        return minimize(self)
-
+        return self._canonicalize()
+
+    def _canonicalize(self) -> DFA:
+        """Returns the minimal normalized DFA. Computed at most once."""
+        if self._canonical is None:
+            from dfa.utils import minimize
+            canonical = minimize(self)
+            object.__setattr__(canonical, "_canonical", canonical)
+            object.__setattr__(self, "_canonical", canonical)
+        return self._canonical
+
+    @timed('to_int')
     @boolean_only
     def to_int(self, input_order: OrderedAlphabet | None = None) -> int:
-        from dfa.utils import dfa2dict, minimize
-        from bitarray import bitarray
-        from bitarray.util import int2ba, ba2int
-
-        if input_order is None:
-            input_order = sorted(self.inputs)
-        elif not (set(input_order) < self.inputs):
-            raise ValueError('Some inputs missing from input order.')
-        graph, start = dfa2dict(minimize(self), reindex=True)
-        accepting = {s for s, (label, _) in graph.items() if label}
-
-        state_bits = bits_needed(len(graph))
-        input_bits = bits_needed(len(input_order))
-
-        encoding = bitarray([1])  # Start with 1 for int conversion.
-        # Specify number of states and inputs.
-        # Format:
-        # 1. zero delimited unary encoding of number of bits needed.
-        # 2. binary encoding of |states| and |inputs|.
-        if state_bits:
-            encoding.extend(int2ba((1 << state_bits) - 1, state_bits))
-        encoding.append(0)
-        if state_bits:
-            encoding.extend(int2ba(len(graph) - 1, state_bits))
-        encoding.extend(int2ba((1 << input_bits) - 1, input_bits))
-        encoding.append(0)
-        encoding.extend(int2ba(len(self.inputs) - 1, input_bits))
-
-        # Specify accepting (or rejecting set).
-        specify_rejecting = len(accepting) * 2 >= len(graph) + 1
-        indicies = set(graph) - accepting if specify_rejecting else accepting
-
-        encoding.append(specify_rejecting)
-        if state_bits:
-            encoding.extend(int2ba(len(indicies) - 1, state_bits))
-
-        for idx in indicies:
-            encoding.extend(int2ba(idx, state_bits))
-
-        for start in range(len(graph)):
-            transitions = graph[start][1]
-            for i, sym in enumerate(input_order):
-                end = transitions[sym]
-                if start == end:
-                    continue
-                encoding.extend(int2ba(start, state_bits))
-                encoding.extend(int2ba(i, input_bits))
-                encoding.extend(int2ba(end, state_bits))
-        return ba2int(encoding)
+        from dfa.codec import encode
+        return encode(self, input_order)
 
     @staticmethod
     def from_int(encoding: int, inputs: OrderedAlphabet | None = None) -> DFA:
-        from bitarray.util import int2ba, ba2int
-        encoding = int2ba(encoding)[1:]  # Ignore leading 1.
-
-        # Parse state bits info.
-        idx = encoding.find(0)
-        state_bits = idx
-        encoding = encoding[idx+1:]
-        if idx > 0:
-            n_states = ba2int(encoding[:state_bits]) + 1
-            encoding = encoding[state_bits:]
-        else:
-            n_states = 1
-
-        # Parse input bits info.
-        idx = encoding.find(0)
-        input_bits = idx
-        encoding = encoding[idx+1:]
-        n_inputs = ba2int(encoding[:input_bits]) + 1
-        if inputs is not None:
-            assert n_inputs == len(inputs)
-        else:
-            inputs = range(n_inputs)
-        encoding = encoding[input_bits:]
-
-        # Specify accepting or rejecting set convention.
-        specify_rejecting = bool(encoding[0])
-        encoding = encoding[1:]
-
-        if len(encoding) == 0:  # Must be a single state DFA.
-            assert n_states == 1
-            return DFA(
-                start=specify_rejecting,
-                inputs=inputs,
-                transition=lambda *_: specify_rejecting,
-                label=lambda _: specify_rejecting,
-            )
-        n_accepting = ba2int(encoding[:state_bits]) + 1
-        encoding = encoding[state_bits:]
-        accepting = set()
-        for _ in range(n_accepting):
-            idx = ba2int(encoding[:state_bits])
-            accepting.add(idx)
-            encoding = encoding[state_bits:]
-
-        # Remaining bits are non-stuttering transitions.
-        transitions = {}
-        while len(encoding) != 0:
-            start = ba2int(encoding[:state_bits])
-            encoding = encoding[state_bits:]
-
-            sym = ba2int(encoding[:input_bits])
-            sym = inputs[sym]
-            encoding = encoding[input_bits:]
-
-            end = ba2int(encoding[:state_bits])
-            encoding = encoding[state_bits:]
-
-            transitions[start, sym] = end
-
-        return DFA(
-            start=0,
-            inputs=inputs,
-            label=lambda s: (s in accepting) ^ specify_rejecting,
-            transition=lambda s, c: transitions.get((s, c), s),
-        )
+        from dfa.codec import decode
+        return decode(encoding, inputs)
 
     def __hash__(self) -> int:
         if self._hash is None:
             try:  # First try to use integer encoding.
                 _hash = self.to_int()
             except (TypeError, ValueError):
-                _hash = hash(repr(self.normalize()))
+                canonical = self._canonicalize()
+                if sortable(self.inputs):
+                    _hash = hash(repr(canonical))
+                else:  # Numbering of canonical states depends on ids.
+                    labels = map(canonical._label, canonical.states())
+                    _hash = hash((self.inputs, len(canonical.states()),
+                                  frozenset(Counter(labels).items())))
 
             object.__setattr__(self, "_hash", _hash)  # Cache hash.
+            if self._canonical is not None:
+                object.__setattr__(self._canonical, "_hash", _hash)
         return self._hash
 
+    @timed('eq')
     def __eq__(self, other: DFA) -> bool:
         from dfa.utils import find_equiv_counterexample as test_equiv
         from dfa.utils import dfa2dict
 
         if not isinstance(other, DFA):
             return False
+        if self.inputs != other.inputs:
+            return False
 
+        canonical_known = None not in (self._canonical, other._canonical)
         bool_ = {True, False}
-        if (self.outputs <= bool_) and (other.outputs <= bool_):
+        if not sortable(self.inputs):  # Canonical forms depend on ids.
             return test_equiv(self, other) is None
-        else:
-            return dfa2dict(self, reindex=True) \
-                    == dfa2dict(other, reindex=True)
+        if not canonical_known and \
+           (self.outputs <= bool_) and (other.outputs <= bool_):
+            return test_equiv(self, other) is None
+        # Minimal normalized DFAs are equivalent iff they are identical.
+        return dfa2dict(self._canonicalize()) \
+            == dfa2dict(other._canonicalize())
 
     def run(self, *, start=None, label=False):
         """Co-routine interface for simulating runs of the automaton.
@@ -222,27 +184,84 @@ class DFA:
         If label is True, then state labels are returned instead
         of states.
         """
-        labeler = self.dfa._label if label else lambda x: x
+        labeler = self._label if label else lambda x: x
 
         state = self.start if start is None else start
         while True:
             letter = yield labeler(state)
-            state = self.transition((letter,), start=state)
+            assert (self.inputs is None) or (letter in self.inputs)
+            state2 = self._transition(state, letter)
+            if state2 == state and self._is_sink(state):
+                break
+            state = state2
+
+        output = labeler(state)  # Absorbed. Remaining letters are ignored.
+        while True:
+            yield output
+
+    def _is_sink(self, state) -> bool:
+        """Returns whether state is absorbing, i.e., only has self loops."""
+        if self.inputs is None:
+            return False
+        if self._sinks is None:  # Same cache size as transitions.
+            maxsize = self._transition.cache_info().maxsize
+            sinks = memoize(_sink_test(self._transition, self.inputs),
+                            maxsize, kind='sink')
+            object.__setattr__(self, "_sinks", sinks)
+        return self._sinks(state)
 
     def trace(self, word, *, start=None):
         state = self.start if start is None else start
         yield state
 
+        word = iter(word)
         for char in word:
             assert (self.inputs is None) or (char in self.inputs)
-            state = self._transition(state, char)
+            state2 = self._transition(state, char)
+            yield state2
+            if state2 == state and self._is_sink(state):
+                break
+            state = state2
+
+        for _ in word:  # Absorbed. No need to compute transitions.
             yield state
 
     def transition(self, word, *, start=None):
-        return fn.last(self.trace(word, start=start))
+        """Returns the state reached by word.
 
-    def advance(self, word, *, start=None):
-        return evolve(self, start=self.transition(word, start=start))
+        Stops reading word once an absorbing (sink) state is reached.
+        """
+        state = self.start if start is None else start
+        for char in word:
+            assert (self.inputs is None) or (char in self.inputs)
+            state2 = self._transition(state, char)
+            if state2 == state and self._is_sink(state):
+                break
+            state = state2
+        return state
+
+    def advance(self, word, *, start=None, canonical=False):
+        """Returns the DFA starting at the state reached by word.
+
+        If canonical is True, returns a shared, already hashed DFA over
+        minimal states instead. The first such call minimizes the DFA,
+        afterwards advancing (also the result) only reads the word.
+        """
+        state = self.transition(word, start=start)
+        if canonical:
+            return self._intern_progressions()[state]
+        advanced = evolve(self, start=state)
+        object.__setattr__(advanced, "_sinks", self._sinks)  # Same edges.
+        return advanced
+
+    def _intern_progressions(self) -> Progressions:
+        if self._progressions is None:
+            from dfa.progression import progressions
+            object.__setattr__(self, "_progressions", progressions(self))
+            if self._canonical is None:  # Minimized as a by-product.
+                canonical = self._progressions[self.start]._canonical
+                object.__setattr__(self, "_canonical", canonical)
+        return self._progressions
 
     def label(self, word, *, start=None):
         output = self._label(self.transition(word, start=start))
@@ -250,17 +269,32 @@ class DFA:
         return output
 
     def transduce(self, word, *, start=None):
-        return tuple(map(self._label, self.trace(word, start=start)))[:-1]
+        state = self.start if start is None else start
+        outputs = []
+        chars = iter(word)
+        for char in chars:
+            assert (self.inputs is None) or (char in self.inputs)
+            outputs.append(self._label(state))
+            state2 = self._transition(state, char)
+            if state2 == state and self._is_sink(state):
+                break
+            state = state2
+        else:
+            return tuple(outputs)
+
+        # Absorbed. Remaining outputs are all the same.
+        if hasattr(word, '__len__'):
+            remaining = len(word) - len(outputs)
+        else:
+            remaining = sum(1 for _ in chars)
+        return tuple(outputs) + (outputs[-1],) * remaining
 
+    @timed('walk', items='explored_states')
     def walk(self) -> Iterable[State, Word]:
         """Performs DFS through DFA yields states and their access strings."""
         assert self.inputs is not None, "Need to specify inputs field!"
 
-        # Make search deterministic.
-        try:
-            inputs = sorted(self.inputs)  # Try to respect inherent order.
-        except TypeError:
-            inputs = sorted(self.inputs, key=id)  # Fall back on object ids.
+        inputs = ordered(self.inputs)  # Make search deterministic.
 
         visited = set()
         stack = [((self.start, ()), 0)]
@@ -285,16 +319,42 @@ class DFA:
             object.__setattr__(self, "_states", states)  # Cache states.
         return frozenset(self._states)
 
+    def __getstate__(self):
+        # Caches are dropped. So is the hash, since hashes of reprs (used
+        # for non-Boolean DFAs) differ between processes.
+        state = {f.name: getattr(self, f.name)
+                 for f in attr.fields(DFA) if f.init}
+        state['_hash'] = None
+        return state
+
+    def __setstate__(self, state):
+        for field in attr.fields(DFA):
+            value = state.get(field.name, field.default)
+            object.__setattr__(self, field.name, value)
+
+    def compile(self) -> CompiledDFA:
+        """Explores the DFA and returns a dense transition table version.
+
+        The result is cached, so repeated calls are free.
+        """
+        if self._compiled is None:
+            from dfa.compiled import compile_dfa
+            object.__setattr__(self, "_compiled", compile_dfa(self))
+        return self._compiled
+
     def find_word(self, label=True) -> Optional[Word]:
         """DFS for word that accesses a state labeled `label`.
 
         Returns shortest word if one exists. Otherwise None.
         """
-        return fn.first(w for s, w in self.walk() if self._label(s) == label)
+        words = (w for s, w in self.walk() if self._label(s) == label)
+        return next(words, None)
 
     @boolean_only
     def __invert__(self):
-        return evolve(self, label=lambda s: not self._label(s))
+        # Negation is cheap, so only the underlying labels are cached.
+        label = memoize(lambda s: not self._label(s), maxsize=0)
+        return evolve(self, label=label)
 
     def _bin_op(self, other, op):
         if self.inputs != other.inputs:
@@ -1,24 +1,80 @@
-import pydot
+"""Export of DFAs to graphviz's DOT format.
 
-import dfa
+DOT text is streamed to a file handle while exploring the DFA, so no
+graph object is built in memory. Parallel edges are merged into a
+single edge labeled with the set of letters.
+"""
+from __future__ import annotations
 
+from typing import TextIO
 
-def write_dot(dfa_, path):
-    dfa_dict, init = dfa.dfa2dict(dfa_)
+from dfa.dfa import DFA, ordered
 
-    nodes = {
-        k: pydot.Node(i+1, label=f"{k}\n---\n{v}")
-        for i, (k, (v, _)) in enumerate(dfa_dict.items())
-    }
-    g = pydot.Graph()
-    init_node = pydot.Node(0, shape="point", label="")
-    g.add_node(init_node)
-    g.add_edge(pydot.Edge(init_node, nodes[init]))
 
-    for start, (_, transitions) in dfa_dict.items():
-        g.add_node(nodes[start])
-        for action, end in transitions.items():
-            g.add_edge(pydot.Edge(nodes[start], nodes[end], label=str(action)))
+def _quote(obj) -> str:
+    text = str(obj).replace('\\', '\\\\').replace('"', '\\"')
+    return '"' + text.replace('\n', '\\n') + '"'
 
+
+def dump_dot(dfa_: DFA, f: TextIO, *, collapse_sinks: bool = False,
+             hide_rejecting_sinks: bool = False) -> None:
+    """Writes dfa_ in DOT format to the file handle f.
+
+    - collapse_sinks: Draws all absorbing states with the same label as
+      a single node without self loops.
+    - hide_rejecting_sinks: Omits absorbing states labeled False and
+      the edges leading into them.
+    """
+    if hide_rejecting_sinks and not (dfa_.outputs <= {True, False}):
+        raise ValueError("Rejecting states require Boolean outputs.")
+    inputs = ordered(dfa_.inputs)
+    names = [str(a) for a in inputs]
+    ids, sink_ids = {}, {}
+
+    def node_id(state) -> int:
+        if collapse_sinks and dfa_._is_sink(state):
+            label = dfa_._label(state)
+            if label not in sink_ids:
+                sink_ids[label] = len(ids) + len(sink_ids) + 1
+                f.write(f'{sink_ids[label]} [label={_quote(label)}];\n')
+            return sink_ids[label]
+        if state not in ids:
+            ids[state] = len(ids) + len(sink_ids) + 1
+        return ids[state]
+
+    def hidden(state) -> bool:
+        return hide_rejecting_sinks and not dfa_._label(state) \
+            and dfa_._is_sink(state)
+
+    f.write('digraph G {\n')
+    f.write('0 [shape=point, label=""];\n')
+    if not hidden(dfa_.start):
+        f.write(f'0 -> {node_id(dfa_.start)};\n')
+
+    for state, _ in dfa_.walk():
+        if hidden(state):
+            continue
+        if collapse_sinks and dfa_._is_sink(state):
+            node_id(state)  # Shared node. Self loops are omitted.
+            continue
+        label = f"{state}\n---\n{dfa_._label(state)}"
+        src = node_id(state)
+        lines = [f'{src} [label={_quote(label)}];\n']
+
+        groups = {}  # Merge parallel edges.
+        for letter, name in zip(inputs, names):
+            succ = dfa_._transition(state, letter)
+            groups.setdefault(succ, []).append(name)
+        for succ, group in groups.items():
+            if hidden(succ):
+                continue
+            lines.append(f'{src} -> {node_id(succ)} '
+                         f'[label={_quote(", ".join(group))}];\n')
+        f.write(''.join(lines))
+    f.write('}\n')
+
+
+def write_dot(dfa_: DFA, path, **kwargs) -> None:
+    """Writes dfa_ to a DOT file. See dump_dot for options."""
     with open(path, 'w') as f:
-        f.write(str(g))
+        dump_dot(dfa_, f, **kwargs)
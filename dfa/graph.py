@@ -0,0 +1,139 @@
+"""Graph analytics over compiled DFAs.
+
+All results are dense arrays indexed by state index, e.g., for batched
+lookups such as graph.distance_to_accept[states].
+"""
+from __future__ import annotations
+
+from functools import cached_property
+
+import numpy as np
+
+from dfa.compiled import CompiledDFA
+
+
+UNREACHABLE = -1
+
+
+def gather(offsets: np.ndarray, values: np.ndarray,
+           nodes: np.ndarray) -> np.ndarray:
+    """Concatenates values[offsets[n]:offsets[n + 1]] for n in nodes."""
+    starts, ends = offsets[nodes], offsets[nodes + 1]
+    lengths = ends - starts
+    shift = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return values[shift + np.arange(lengths.sum())]
+
+
+class GraphIndex:
+    """Reverse transition index of a compiled DFA and queries using it.
+
+    Queries are computed on first access and then kept.
+    """
+
+    def __init__(self, compiled: CompiledDFA):
+        self.compiled = compiled
+        table = compiled.table
+        n_states, n_inputs = table.shape
+
+        # Predecessors of t are sources[offsets[t]:offsets[t + 1]].
+        targets = table.ravel()
+        order = np.argsort(targets, kind='stable')
+        self.sources = (order // max(n_inputs, 1)).astype(np.int32)
+        counts = np.bincount(targets, minlength=n_states)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def predecessors(self, state: int) -> np.ndarray:
+        return self.sources[self.offsets[state]:self.offsets[state + 1]]
+
+    def distance_to(self, targets: np.ndarray) -> np.ndarray:
+        """Minimum number of letters needed to reach a target state.
+
+        Unreachable targets have distance UNREACHABLE (-1).
+        """
+        dist = np.full(len(self.compiled), UNREACHABLE, dtype=np.int64)
+        frontier = np.flatnonzero(targets)
+        depth = 0
+        while len(frontier):
+            dist[frontier] = depth
+            preds = np.unique(gather(self.offsets, self.sources, frontier))
+            frontier = preds[dist[preds] == UNREACHABLE]
+            depth += 1
+        return dist
+
+    def coreachable(self, targets: np.ndarray) -> np.ndarray:
+        """Mask of the states that can reach a target state."""
+        return self.distance_to(targets) != UNREACHABLE
+
+    @cached_property
+    def distance_to_accept(self) -> np.ndarray:
+        return self.distance_to(self.compiled.labels == True)  # noqa: E712
+
+    @cached_property
+    def distance_to_reject(self) -> np.ndarray:
+        return self.distance_to(self.compiled.labels == False)  # noqa: E712
+
+    @cached_property
+    def live(self) -> np.ndarray:
+        """Mask of the states that can still reach an accepting state."""
+        return self.distance_to_accept != UNREACHABLE
+
+    @property
+    def sinks(self) -> np.ndarray:
+        """Mask of the absorbing states, i.e., only self loops."""
+        return self.compiled.sinks
+
+    @cached_property
+    def traps(self) -> np.ndarray:
+        """Mask of the states whose label can no longer change."""
+        labels = self.compiled.labels
+        n_reachable = np.zeros(len(labels), dtype=np.int64)
+        for label in set(labels.tolist()):
+            n_reachable += self.coreachable(labels == label)
+        return n_reachable == 1
+
+    @cached_property
+    def sccs(self) -> np.ndarray:
+        """Strongly connected component of each state.
+
+        Components are numbered in reverse topological order, i.e., if a
+        transition leads from component i to component j, then j <= i.
+        """
+        # Iterative version of Tarjan's algorithm.
+        succs = self.compiled.table.tolist()
+        n_states = len(succs)
+        index, lowlink = [UNREACHABLE] * n_states, [0] * n_states
+        on_stack, stack = [False] * n_states, []
+        component = [UNREACHABLE] * n_states
+        n_components = counter = 0
+        for root in range(n_states):
+            if index[root] != UNREACHABLE:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, i = work.pop()
+                if i == 0:
+                    index[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                elif i <= len(succs[node]):  # Returning from succ i - 1.
+                    succ = succs[node][i - 1]
+                    lowlink[node] = min(lowlink[node], lowlink[succ])
+                for j in range(i, len(succs[node])):
+                    succ = succs[node][j]
+                    if index[succ] == UNREACHABLE:
+                        work.append((node, j + 1))
+                        work.append((succ, 0))
+                        break
+                    elif on_stack[succ]:
+                        lowlink[node] = min(lowlink[node], index[succ])
+                else:
+                    if lowlink[node] == index[node]:  # Root of component.
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            component[member] = n_components
+                            if member == node:
+                                break
+                        n_components += 1
+        return np.array(component, dtype=np.int32)
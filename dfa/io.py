@@ -0,0 +1,124 @@
+"""Flat binary on-disk format for explicit DFAs.
+
+Layout (little endian, sections 8 byte aligned):
+
+1. Header: magic, version, flags, |states|, |inputs|, start index and
+   the size of the metadata section.
+2. Metadata: JSON encoded letters (in table column order) and outputs.
+3. Labels: One uint8 per state for Boolean DFAs. Otherwise one int32
+   index into the outputs per state.
+4. Transitions: |states| x |inputs| int32 matrix.
+
+Loading memory maps the label and transition sections, so opening a
+file is nearly instant and pages are read on demand.
+"""
+from __future__ import annotations
+
+import json
+import struct
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from dfa.dfa import DFA
+from dfa.compiled import CompiledDFA, align, pack_labels, unpack_labels
+
+
+MAGIC = b'DFATABLE'
+VERSION = 1
+HEADER = struct.Struct('<8sIIqqqq')
+BOOLEAN_LABELS = 1
+
+PathLike = Union[str, Path]
+
+
+def _tupleize(obj):
+    """JSON turns tuples into lists. Undo that to keep objects hashable."""
+    if isinstance(obj, list):
+        return tuple(map(_tupleize, obj))
+    return obj
+
+
+def save(dfa_: DFA | CompiledDFA, path: PathLike) -> None:
+    """Writes an explicit DFA to path.
+
+    States are replaced by their indices. Letters and outputs must be
+    JSON serializable (tuples are restored on load).
+    """
+    compiled = dfa_.compile() if isinstance(dfa_, DFA) else dfa_
+    n_states, n_inputs = compiled.table.shape
+
+    boolean = compiled.labels.dtype == bool
+    outputs, labels = pack_labels(compiled)
+
+    try:
+        meta = json.dumps({
+            'inputs': list(compiled.inputs), 'outputs': outputs,
+        }).encode()
+    except TypeError as err:
+        raise ValueError(
+            f"Letters and outputs must be JSON serializable: {err}"
+        ) from err
+
+    header = HEADER.pack(MAGIC, VERSION, BOOLEAN_LABELS if boolean else 0,
+                         n_states, n_inputs, compiled.start, len(meta))
+    table = np.asarray(compiled.table, dtype='<i4')
+    with open(path, 'wb') as f:
+        f.write(header + meta)
+        for section in (labels, table):
+            f.write(b'\0' * (align(f.tell()) - f.tell()))
+            section.tofile(f)
+
+
+def load_compiled(path: PathLike, *, mmap: bool = True) -> CompiledDFA:
+    """Reads a DFA written by save as a compiled table."""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not a DFA file.")
+        magic, version, flags, n_states, n_inputs, start, meta_size = \
+            HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a DFA file.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported DFA file version: {version}.")
+        meta = json.loads(f.read(meta_size))
+    inputs = _tupleize(meta['inputs'])
+    outputs = _tupleize(meta['outputs'])
+
+    boolean = bool(flags & BOOLEAN_LABELS)
+    label_dtype = np.dtype(np.uint8 if boolean else '<i4')
+    label_offset = align(HEADER.size + meta_size)
+    table_offset = align(label_offset + n_states * label_dtype.itemsize)
+
+    def read(dtype, offset, shape):
+        if 0 in shape:
+            return np.zeros(shape, dtype=dtype)
+        if mmap:
+            return np.memmap(path, dtype=dtype, mode='r', offset=offset,
+                             shape=shape)
+        return np.fromfile(path, dtype=dtype, offset=offset,
+                           count=int(np.prod(shape))).reshape(shape)
+
+    labels = unpack_labels(read(label_dtype, label_offset, (n_states,)),
+                           outputs)
+    table = read(np.dtype('<i4'), table_offset, (n_states, n_inputs))
+
+    return CompiledDFA(
+        start=start,
+        table=table,
+        labels=labels,
+        states=range(n_states),
+        inputs=inputs,
+        outputs=outputs,
+    )
+
+
+def load(path: PathLike, *, mmap: bool = True) -> DFA:
+    """Reads a DFA written by save.
+
+    States are integers. The table is available via the DFA's compile
+    method at no extra cost.
+    """
+    return load_compiled(path, mmap=mmap).to_dfa()
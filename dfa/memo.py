@@ -0,0 +1,110 @@
+"""Configurable memoization of DFA transition and label functions.
+
+Cache sizes follow functools.lru_cache:
+
+- None: Unbounded cache (default).
+- n > 0: Least recently used cache holding at most n entries.
+- 0: No caching. Calls are still counted.
+
+Caches of DFA label and transition functions are registered (weakly) by
+kind, so that dfa.stats can aggregate their counters.
+"""
+from __future__ import annotations
+
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional
+
+import attr
+
+
+_DEFAULT = object()  # Sentinel for using the global cache size.
+_maxsize: Optional[int] = None
+_registry: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class DFACacheStats(NamedTuple):
+    label: CacheStats
+    transition: CacheStats
+
+
+def get_cache_size() -> Optional[int]:
+    return _maxsize
+
+
+def set_cache_size(maxsize: Optional[int]) -> None:
+    """Sets the cache size used for newly memoized functions."""
+    global _maxsize
+    if maxsize is not None and maxsize < 0:
+        raise ValueError("Cache size must be None or non-negative.")
+    _maxsize = maxsize
+
+
+@contextmanager
+def cache_size(maxsize: Optional[int]):
+    """Temporarily sets the cache size used for newly memoized functions."""
+    prev = _maxsize
+    set_cache_size(maxsize)
+    try:
+        yield
+    finally:
+        set_cache_size(prev)
+
+
+def is_memoized(func: Callable) -> bool:
+    return hasattr(func, 'cache_info')
+
+
+def memoize(func: Callable, maxsize=_DEFAULT, *,
+            kind: Optional[str] = None) -> Callable:
+    """Memoizes func, reusing its cache if func is already memoized.
+
+    If maxsize is given, then func is (re)memoized using a cache of
+    that size. Otherwise the global cache size is used. If kind is
+    given, the cache is registered under that kind.
+    """
+    if maxsize is _DEFAULT and is_memoized(func):
+        memoized = func  # Share existing cache.
+    else:
+        if maxsize is _DEFAULT:
+            maxsize = _maxsize
+        elif is_memoized(func):
+            func = func.__wrapped__
+        memoized = lru_cache(maxsize=maxsize)(func)
+    if kind is not None:
+        _registry[memoized] = kind
+    return memoized
+
+
+def registered_caches() -> list[tuple[Callable, str]]:
+    """Returns the live registered caches and their kinds."""
+    return list(_registry.items())
+
+
+def cache_stats(dfa_) -> DFACacheStats:
+    """Returns hit, miss and eviction counts of dfa_'s caches."""
+    def stats(func):
+        info = func.cache_info()
+        evictions = info.misses - info.currsize if info.maxsize != 0 else 0
+        return CacheStats(info.hits, info.misses, evictions,
+                          info.maxsize, info.currsize)
+
+    return DFACacheStats(stats(dfa_._label), stats(dfa_._transition))
+
+
+def with_cache_size(dfa_, maxsize: Optional[int]):
+    """Returns a version of dfa_ with fresh caches of the given size."""
+    return attr.evolve(
+        dfa_,
+        label=memoize(dfa_._label, maxsize),
+        transition=memoize(dfa_._transition, maxsize),
+    )
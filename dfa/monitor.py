@@ -0,0 +1,116 @@
+"""Vectorized monitoring of many concurrent runs of a DFA.
+
+All session states live in a single integer array, so a batch of
+sessions is advanced with one fancy indexing step on the compiled
+transition table.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from dfa.dfa import DFA, Letter, State
+from dfa.compiled import CompiledDFA
+
+
+class Step(NamedTuple):
+    """Sessions whose label changed or that got absorbed by a sink."""
+    changed: np.ndarray
+    absorbed: np.ndarray
+
+
+class MonitorPool:
+    """Pool of monitoring sessions of a single explicit DFA.
+
+    Sessions are identified by integers. Adding and removing sessions
+    takes (amortized) constant time, freed ids are reused.
+    """
+
+    def __init__(self, dfa_: DFA | CompiledDFA, capacity: int = 1024):
+        compiled = dfa_.compile() if isinstance(dfa_, DFA) else dfa_
+        self.compiled = compiled
+        self._states = np.zeros(capacity, dtype=np.int32)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._free = list(range(capacity - 1, -1, -1))
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, session: int) -> bool:
+        return 0 <= session < len(self._active) and self._active[session]
+
+    @property
+    def sessions(self) -> np.ndarray:
+        """Ids of the active sessions in increasing order."""
+        return np.flatnonzero(self._active)
+
+    def add(self, start: Optional[State] = None) -> int:
+        """Starts a new session at start (defaults to the DFA's start)."""
+        if not self._free:  # Double capacity.
+            capacity = len(self._states)
+            self._states = np.resize(self._states, 2 * capacity)
+            self._active = np.concatenate([self._active,
+                                           np.zeros(capacity, dtype=bool)])
+            self._free = list(range(2 * capacity - 1, capacity - 1, -1))
+        session = self._free.pop()
+        self._states[session] = self.compiled._start(start)
+        self._active[session] = True
+        self._size += 1
+        return session
+
+    def remove(self, session: int) -> None:
+        if session not in self:
+            raise KeyError(session)
+        self._active[session] = False
+        self._free.append(session)
+        self._size -= 1
+
+    def _check(self, sessions) -> np.ndarray:
+        if sessions is None:
+            return self.sessions
+        sessions = np.asarray(sessions, dtype=np.int64)
+        if len(sessions) and (
+            sessions.min() < 0 or sessions.max() >= len(self._active)
+            or not self._active[sessions].all()
+        ):
+            raise KeyError("Unknown or removed session.")
+        return sessions
+
+    def state(self, session: int) -> State:
+        return self.compiled.states[self._states[self._check([session])[0]]]
+
+    def labels(self, sessions: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Current labels of sessions (defaults to all active sessions)."""
+        return self.compiled.labels[self._states[self._check(sessions)]]
+
+    def encode(self, letters: Sequence[Letter]) -> np.ndarray:
+        """Converts letters into column indices of the compiled table."""
+        col = self.compiled.letter2col.__getitem__
+        return np.fromiter(map(col, letters), dtype=np.int32,
+                           count=len(letters))
+
+    def step(self, letters: Sequence[Letter],
+             sessions: Optional[Sequence[int]] = None) -> Step:
+        """Advances each session by its letter. See step_indices."""
+        return self.step_indices(self.encode(letters), sessions)
+
+    def step_indices(self, cols: np.ndarray,
+                     sessions: Optional[Sequence[int]] = None) -> Step:
+        """Advances sessions[i] by the letter with column index cols[i].
+
+        Sessions default to all active sessions (in increasing order).
+        Each session may appear at most once per step.
+        """
+        sessions = self._check(sessions)
+        if len(cols) != len(sessions):
+            raise ValueError("Need exactly one letter per session.")
+        compiled = self.compiled
+        prev = self._states[sessions]
+        curr = compiled.table[prev, cols]
+        self._states[sessions] = curr
+
+        changed = compiled.labels[curr] != compiled.labels[prev]
+        absorbed = compiled.sinks[curr] & ~compiled.sinks[prev]
+        return Step(changed=sessions[changed], absorbed=sessions[absorbed])
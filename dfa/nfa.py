@@ -0,0 +1,124 @@
+"""Nondeterministic finite automata with lazy determinization.
+
+The subset construction is performed on the fly: a subset of NFA states
+is an int whose i-th bit marks the i-th NFA state seen so far. NFA
+states are indexed when first reached, so only the explored part of
+the NFA and of its determinization is ever stored.
+"""
+from __future__ import annotations
+
+from typing import Callable, Iterable
+
+import attr
+
+from dfa.dfa import DFA, State, Letter, Alphabet
+
+
+Bits = int
+
+
+def members(bits: Bits) -> Iterable[int]:
+    """Indices of the set bits, in increasing order."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _no_moves(state: State) -> Iterable[State]:
+    return ()
+
+
+@attr.frozen(eq=False)
+class NFA:
+    """NFA with (optional) epsilon moves.
+
+    - transition(s, a): Iterable of the successors of s under a.
+    - epsilon(s): Iterable of the states reachable from s by one
+      epsilon move.
+    - accepting(s): Whether s is accepting.
+    """
+    starts: frozenset[State] = attr.ib(converter=frozenset)
+    inputs: Alphabet = attr.ib(converter=frozenset)
+    transition: Callable[[State, Letter], Iterable[State]]
+    accepting: Callable[[State], bool]
+    epsilon: Callable[[State], Iterable[State]] = _no_moves
+
+    # Lazily built indices and subset caches.
+    _states: list[State] = attr.ib(factory=list, init=False, repr=False)
+    _index: dict[State, int] = attr.ib(factory=dict, init=False, repr=False)
+    _accepting: Bits = attr.ib(default=0, init=False, repr=False)
+    _closures: dict[int, Bits] = attr.ib(factory=dict, init=False,
+                                         repr=False)
+    _moves: dict[tuple[int, Letter], Bits] = attr.ib(
+        factory=dict, init=False, repr=False
+    )
+    _subsets: dict[Bits, Bits] = attr.ib(factory=dict, init=False,
+                                         repr=False)
+
+    def _bit(self, state: State) -> Bits:
+        """Returns the bit of state, indexing it on first sight."""
+        idx = self._index.get(state)
+        if idx is None:
+            idx = self._index[state] = len(self._states)
+            self._states.append(state)
+            if self.accepting(state):
+                accepting = self._accepting | (1 << idx)
+                object.__setattr__(self, "_accepting", accepting)
+        return 1 << idx
+
+    def _closure(self, idx: int) -> Bits:
+        """Bits of the states reachable from state idx by epsilon moves."""
+        closure = self._closures.get(idx)
+        if closure is None:
+            closure, stack = 1 << idx, [self._states[idx]]
+            while stack:
+                for succ in self.epsilon(stack.pop()):
+                    bit = self._bit(succ)
+                    if not closure & bit:
+                        closure |= bit
+                        stack.append(succ)
+            self._closures[idx] = closure
+        return closure
+
+    def _close(self, bits: Bits) -> Bits:
+        closed = 0
+        for idx in members(bits):
+            closed |= self._closure(idx)
+        return self._subsets.setdefault(closed, closed)  # Intern.
+
+    def _move(self, bits: Bits, letter: Letter) -> Bits:
+        """Successor subset of bits under letter (epsilon closed)."""
+        result = 0
+        for idx in members(bits):
+            move = self._moves.get((idx, letter))
+            if move is None:
+                move = 0
+                for succ in self.transition(self._states[idx], letter):
+                    move |= self._bit(succ)
+                move = self._moves[idx, letter] = self._close(move)
+            result |= move
+        return self._subsets.setdefault(result, result)
+
+    def _start(self) -> Bits:
+        bits = 0
+        for state in self.starts:
+            bits |= self._bit(state)
+        return self._close(bits)
+
+    def decode(self, bits: Bits) -> frozenset[State]:
+        """Returns the NFA states of a subset (state of to_dfa())."""
+        return frozenset(self._states[idx] for idx in members(bits))
+
+    def to_dfa(self) -> DFA:
+        """Determinizes the NFA lazily.
+
+        States of the DFA are subsets (as ints, see decode) and are only
+        constructed when reached, e.g., by label, walk or products.
+        """
+        return DFA(
+            start=self._start(),
+            inputs=self.inputs,
+            label=lambda bits: bool(bits & self._accepting),
+            transition=self._move,
+        )
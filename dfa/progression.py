@@ -0,0 +1,55 @@
+"""Interned canonical DFAs for each state of a DFA (progression).
+
+The states of a DFA are grouped by language in a single minimization
+pass. Each group is represented by one shared DFA over the minimal
+states, whose canonical form and hash are computed on first use.
+"""
+from __future__ import annotations
+
+from typing import Mapping
+
+import attr
+
+from dfa.dfa import DFA, State, evolve
+from dfa.utils import dict2dfa, partition, quotient_dict, tabulate
+
+
+@attr.frozen(eq=False)
+class Progressions:
+    """Maps states to interned DFAs accepting their language.
+
+    Interned DFAs share this cache, so advancing them is a lookup too.
+    """
+    block: Mapping[State, int]  # Index of each state's minimal state.
+    quotient: DFA
+    interned: dict[int, DFA] = attr.ib(factory=dict)
+
+    def __getitem__(self, state: State) -> DFA:
+        idx = self.block[state]
+        interned = self.interned.get(idx)
+        if interned is None:
+            interned = self._intern(idx)
+        return interned
+
+    def _intern(self, idx: int) -> DFA:
+        interned = evolve(self.quotient, start=idx)  # Shares caches.
+        object.__setattr__(interned, "_sinks", self.quotient._sinks)
+        shared = attr.evolve(self, block=range(len(self.quotient.states())))
+        object.__setattr__(interned, "_progressions", shared)
+
+        # The quotient is minimal, so normalizing yields canonical forms.
+        canonical = interned.normalize()
+        object.__setattr__(canonical, "_canonical", canonical)
+        object.__setattr__(interned, "_canonical", canonical)
+        hash(interned)
+        self.interned[idx] = interned
+        return interned
+
+
+def progressions(dfa_: DFA) -> Progressions:
+    """Minimizes dfa_ once and groups its states by language."""
+    states, _, table, labels = tabulated = tabulate(dfa_)
+    block = partition(table, labels)
+    dfa_dict, start = quotient_dict(tabulated, block, dfa_.start)
+    quotient = dict2dfa(dfa_dict, start, outputs=dfa_.outputs)
+    return Progressions(block=dict(zip(states, block)), quotient=quotient)
@@ -0,0 +1,141 @@
+"""Hand off explicit DFAs to other processes via shared memory.
+
+The owner copies the compiled table into a shared memory block once.
+Other processes attach by name and use the table in place. Pickling a
+SharedDFA only sends the block's name, e.g., to pool workers.
+
+Layout (little endian, sections 8 byte aligned):
+
+1. Size of the metadata section (int64).
+2. Metadata: Pickled start index, shape, letters and outputs.
+3. Labels: One uint8 per state for Boolean DFAs. Otherwise one int32
+   index into the outputs per state.
+4. Transitions: |states| x |inputs| int32 matrix.
+"""
+from __future__ import annotations
+
+import pickle
+import struct
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from dfa.dfa import DFA
+from dfa.compiled import CompiledDFA, align, pack_labels, unpack_labels
+
+
+SIZE = struct.Struct('<q')
+
+
+class SharedDFA:
+    """Explicit DFA whose table lives in a shared memory block.
+
+    Drop all references to the DFAs obtained from it before closing.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self.owner = owner
+
+        buf = shm.buf
+        (meta_size,) = SIZE.unpack_from(buf, 0)
+        meta = pickle.loads(buf[SIZE.size:SIZE.size + meta_size])
+        n_states, n_inputs = meta['shape']
+        label_dtype = np.dtype(np.uint8 if meta['boolean'] else '<i4')
+        label_offset = align(SIZE.size + meta_size)
+        table_offset = align(label_offset + n_states * label_dtype.itemsize)
+
+        labels = unpack_labels(
+            np.frombuffer(buf, dtype=label_dtype, count=n_states,
+                          offset=label_offset),
+            meta['outputs'],
+        )
+        table = np.frombuffer(buf, dtype='<i4', count=n_states * n_inputs,
+                              offset=table_offset)
+        table = table.reshape(n_states, n_inputs)
+        labels.flags.writeable = table.flags.writeable = False
+
+        self.compiled = CompiledDFA(
+            start=meta['start'],
+            table=table,
+            labels=labels,
+            states=range(n_states),
+            inputs=meta['inputs'],
+            outputs=meta['outputs'],
+        )
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def dfa(self) -> DFA:
+        """Returns a DFA (with integer states) backed by the shared table."""
+        return self.compiled.to_dfa()
+
+    def close(self) -> None:
+        """Detaches from the block. The owner also frees it."""
+        self.compiled = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> SharedDFA:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __reduce__(self):
+        return attach, (self.name,)
+
+
+def share(dfa_: DFA | CompiledDFA) -> SharedDFA:
+    """Copies an explicit DFA into a new shared memory block.
+
+    States are replaced by their indices. Letters and outputs must be
+    picklable. The returned handle owns (and eventually frees) the block.
+    """
+    compiled = dfa_.compile() if isinstance(dfa_, DFA) else dfa_
+    n_states, n_inputs = compiled.table.shape
+
+    boolean = compiled.labels.dtype == bool
+    outputs, labels = pack_labels(compiled)
+
+    meta = pickle.dumps({
+        'start': compiled.start,
+        'shape': (n_states, n_inputs),
+        'inputs': tuple(compiled.inputs),
+        'outputs': tuple(outputs),
+        'boolean': boolean,
+    })
+    label_offset = align(SIZE.size + len(meta))
+    table_offset = align(label_offset + labels.nbytes)
+    size = table_offset + 4 * n_states * n_inputs
+
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        buf = shm.buf
+        SIZE.pack_into(buf, 0, len(meta))
+        buf[SIZE.size:SIZE.size + len(meta)] = meta
+        buf[label_offset:label_offset + labels.nbytes] = labels.tobytes()
+        table = np.asarray(compiled.table, dtype='<i4')
+        buf[table_offset:size] = table.tobytes()
+        del buf
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    return SharedDFA(shm, owner=True)
+
+
+def attach(name: str) -> SharedDFA:
+    """Attaches to a block created by share (without copying it)."""
+    if sys.version_info >= (3, 13):  # Only the owner frees the block.
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        # Before 3.13 attaching registers the block with the resource
+        # tracker. Child processes share their parent's tracker, so the
+        # duplicate registration is harmless there.
+        shm = shared_memory.SharedMemory(name=name)
+    return SharedDFA(shm, owner=False)
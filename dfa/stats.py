@@ -0,0 +1,189 @@
+"""Opt-in instrumentation of DFA operations.
+
+While a recorder is active, the following are collected:
+
+- Calls, cache hits and misses of label and transition functions.
+  Misses are the calls that reached the user provided function.
+- The number of states explored by walk.
+- Calls and (inclusive) time spent in walk, minimize, to_int, __eq__
+  and dfa2dict.
+
+Cache counters are derived from the memoization caches, so recording
+adds no per call overhead. Timed operations only check whether a
+recorder is active. Recording is process global and not thread safe.
+
+Example:
+
+    with dfa.stats.record() as recorder:
+        my_dfa.minimize()
+    recorder.snapshot().as_dict()
+"""
+from __future__ import annotations
+
+import inspect
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import NamedTuple
+from weakref import WeakKeyDictionary
+
+from dfa.memo import registered_caches
+
+
+KINDS = ('label', 'transition')
+
+_recorders: list[Recorder] = []
+
+
+class Timer(NamedTuple):
+    calls: int
+    seconds: float
+
+
+class Snapshot(NamedTuple):
+    counters: dict[str, int]
+    timers: dict[str, Timer]
+
+    def as_dict(self) -> dict[str, float]:
+        """Flat metric names to values, e.g., for exporting."""
+        metrics = dict(self.counters)
+        for name, timer in self.timers.items():
+            metrics[f'{name}.calls'] = timer.calls
+            metrics[f'{name}.seconds'] = timer.seconds
+        return metrics
+
+
+def _cache_counts(func) -> tuple[int, int]:
+    info = func.cache_info()
+    return info.hits, info.misses
+
+
+class Recorder:
+    """Collects statistics from its creation until it is stopped."""
+
+    def __init__(self):
+        self._counters: dict[str, int] = {}
+        self._timers: dict[str, list] = {}
+        self._baseline = WeakKeyDictionary()
+        for func, _ in registered_caches():
+            self._baseline[func] = _cache_counts(func)
+        self._final = None
+
+    def add_count(self, name: str, count: int = 1) -> None:
+        self._counters[name] = self._counters.get(name, 0) + count
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        timer = self._timers.setdefault(name, [0, 0.0])
+        timer[0] += calls
+        timer[1] += seconds
+
+    def _cache_counters(self) -> dict[str, int]:
+        """Cache activity since the recorder was created.
+
+        Activity of caches that were garbage collected in the meantime
+        is lost.
+        """
+        totals = {kind: [0, 0] for kind in KINDS}
+        for func, kind in registered_caches():
+            hits, misses = _cache_counts(func)
+            hits0, misses0 = self._baseline.get(func, (0, 0))
+            if hits < hits0 or misses < misses0:  # Cache was cleared.
+                hits0 = misses0 = 0
+            total = totals.setdefault(kind, [0, 0])
+            total[0] += hits - hits0
+            total[1] += misses - misses0
+
+        counters = {}
+        for kind, (hits, misses) in totals.items():
+            counters[f'{kind}.calls'] = hits + misses
+            counters[f'{kind}.hits'] = hits
+            counters[f'{kind}.misses'] = misses
+        return counters
+
+    def snapshot(self) -> Snapshot:
+        """Returns the statistics collected so far."""
+        if self._final is not None:
+            return self._final
+        counters = self._cache_counters()
+        counters.update(self._counters)
+        timers = {name: Timer(*timer) for name, timer in self._timers.items()}
+        return Snapshot(counters, timers)
+
+    def stop(self) -> Snapshot:
+        """Stops recording and freezes the snapshot."""
+        if self in _recorders:
+            self._final = self.snapshot()
+            _recorders.remove(self)
+        return self.snapshot()
+
+
+def start() -> Recorder:
+    """Starts a new recorder. Recorders may be nested."""
+    recorder = Recorder()
+    _recorders.append(recorder)
+    return recorder
+
+
+@contextmanager
+def record():
+    """Records statistics of DFA operations within the context."""
+    recorder = start()
+    try:
+        yield recorder
+    finally:
+        recorder.stop()
+
+
+def count(name: str, amount: int = 1) -> None:
+    for recorder in _recorders:
+        recorder.add_count(name, amount)
+
+
+def _add_time(name: str, seconds: float, calls: int = 1) -> None:
+    for recorder in _recorders:
+        recorder.add_time(name, seconds, calls)
+
+
+def _timed_steps(name: str, items: str | None, gen):
+    """Times each step of gen and counts the yielded items."""
+    calls = 1  # Only the first step counts as a call.
+    while True:
+        start_ = perf_counter()
+        try:
+            item = next(gen)
+        except StopIteration:
+            _add_time(name, perf_counter() - start_, calls)
+            return
+        _add_time(name, perf_counter() - start_, calls)
+        calls = 0
+        if items is not None:
+            count(items)
+        yield item
+
+
+def timed(name: str, *, items: str | None = None):
+    """Decorator recording the time spent in the decorated function.
+
+    For generator functions, time is only spent while computing the
+    next item and, if items is given, the yielded items are counted.
+    """
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                gen = func(*args, **kwargs)
+                if not _recorders:
+                    return gen
+                return _timed_steps(name, items, gen)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not _recorders:
+                    return func(*args, **kwargs)
+                start_ = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    _add_time(name, perf_counter() - start_)
+        return wrapper
+    return decorator
@@ -0,0 +1,267 @@
+"""DFAs over truth assignments with guarded transitions.
+
+Letters are truth assignments to atomic propositions 0, ..., k - 1,
+encoded as ints whose i-th bit is the value of proposition i. Instead of
+one edge per letter (2^k per state), each state has a few edges guarded
+by sets of letters.
+
+Guards are unions of pairwise disjoint cubes. A cube (mask, value)
+contains the letters x with x & mask == value.
+
+Queries that need an explicit alphabet first split the letters into
+classes that no guard distinguishes, so that their cost scales with the
+number of distinct guards rather than with 2^k.
+"""
+from __future__ import annotations
+
+import operator
+from collections import deque
+from functools import partial
+from typing import Callable, Iterable, Optional, Sequence
+
+import attr
+
+from dfa.dfa import DFA, State, Letter, Alphabet, Word, boolean_only
+from dfa.memo import memoize
+
+
+Cube = tuple[int, int]
+
+
+def _complement(cube: Cube) -> frozenset[Cube]:
+    """Disjoint cubes covering the letters outside cube."""
+    mask, value = cube
+    cubes, prefix = set(), 0
+    while mask:
+        bit = mask & -mask
+        cubes.add((prefix | bit, (value & prefix) | (~value & bit)))
+        prefix |= bit
+        mask ^= bit
+    return frozenset(cubes)
+
+
+@attr.frozen
+class Guard:
+    """Set of letters represented by pairwise disjoint cubes."""
+    cubes: frozenset[Cube] = attr.ib(converter=frozenset)
+
+    def __bool__(self) -> bool:
+        return bool(self.cubes)
+
+    def __contains__(self, letter: int) -> bool:
+        return any(letter & mask == value for mask, value in self.cubes)
+
+    def __and__(self, other: Guard) -> Guard:
+        return Guard(
+            (mask1 | mask2, value1 | value2)
+            for mask1, value1 in self.cubes for mask2, value2 in other.cubes
+            if not (value1 ^ value2) & mask1 & mask2
+        )
+
+    def __invert__(self) -> Guard:
+        result = TRUE
+        for cube in self.cubes:
+            result &= Guard(_complement(cube))
+        return result
+
+    def __or__(self, other: Guard) -> Guard:
+        return Guard(self.cubes | (other & ~self).cubes)
+
+    def __sub__(self, other: Guard) -> Guard:
+        return self & ~other
+
+    def count(self, num_atoms: int) -> int:
+        """Number of letters over num_atoms propositions in the guard."""
+        return sum(1 << (num_atoms - bin(mask).count('1'))
+                   for mask, _ in self.cubes)
+
+    def witness(self) -> int:
+        """Smallest letter in the guard."""
+        if not self:
+            raise ValueError("Empty guard has no letters.")
+        return min(value for _, value in self.cubes)
+
+
+TRUE = Guard({(0, 0)})
+FALSE = Guard(())
+
+
+def atom(i: int) -> Guard:
+    """Guard of the letters where proposition i holds."""
+    return Guard({(1 << i, 1 << i)})
+
+
+def atoms(num_atoms: int) -> list[Guard]:
+    return [atom(i) for i in range(num_atoms)]
+
+
+def alphabet_classes(guards: Iterable[Guard]) -> list[Guard]:
+    """Coarsest partition of all letters that refines every guard."""
+    classes, seen = [TRUE], set()
+    for guard in guards:
+        if guard.cubes in seen:
+            continue
+        seen.add(guard.cubes)
+        outside = ~guard
+        classes = [part for cls in classes
+                   for part in (cls & guard, cls & outside) if part]
+    return classes
+
+
+Edges = Sequence[tuple[Guard, State]]
+
+
+@attr.frozen(eq=False)
+class SymbolicDFA:
+    """DFA whose transition function maps a state to guarded edges.
+
+    The guards of a state's edges must be disjoint and cover all
+    letters. Edges with empty guards are ignored.
+    """
+    start: State
+    _label: Callable[[State], Letter] = attr.ib(
+        converter=partial(memoize, kind='label')
+    )
+    _transition: Callable[[State], Edges] = attr.ib(
+        converter=partial(memoize, kind='transition')
+    )
+    num_atoms: int
+    outputs: Alphabet = attr.ib(converter=frozenset, default={True, False})
+    _hash: Optional[int] = attr.ib(
+        default=None, init=False, repr=False, eq=False
+    )
+
+    def edges(self, state: State) -> list[tuple[Guard, State]]:
+        return [(g, s) for g, s in self._transition(state) if g]
+
+    def step(self, state: State, letter: int) -> State:
+        for guard, succ in self._transition(state):
+            if letter in guard:
+                return succ
+        raise ValueError(f"No edge from {state} accepts letter {letter}.")
+
+    def transition(self, word: Word, *, start=None) -> State:
+        state = self.start if start is None else start
+        for letter in word:
+            state = self.step(state, letter)
+        return state
+
+    def label(self, word: Word, *, start=None) -> Letter:
+        return self._label(self.transition(word, start=start))
+
+    def states(self) -> frozenset[State]:
+        """States reachable from start (breadth first over edges)."""
+        visited, queue = {self.start}, deque([self.start])
+        while queue:
+            for _, succ in self.edges(queue.popleft()):
+                if succ not in visited:
+                    visited.add(succ)
+                    queue.append(succ)
+        return frozenset(visited)
+
+    def guards(self) -> set[Guard]:
+        """Distinct guards of the reachable edges."""
+        return {g for s in self.states() for g, _ in self.edges(s)}
+
+    def alphabet_classes(self) -> list[Guard]:
+        return alphabet_classes(self.guards())
+
+    def to_dfa(self, classes: Optional[Sequence[Guard]] = None) -> DFA:
+        """Explicit DFA whose letters are one witness per alphabet class.
+
+        Classes must refine every guard and default to the coarsest such
+        partition. To compare several symbolic DFAs, convert them using
+        the classes of all their guards.
+        """
+        if classes is None:
+            classes = self.alphabet_classes()
+        return DFA(
+            start=self.start,
+            inputs=[cls.witness() for cls in classes],
+            label=self._label,
+            transition=self.step,
+            outputs=self.outputs,
+        )
+
+    def minimize(self) -> SymbolicDFA:
+        """Returns the minimal equivalent symbolic DFA.
+
+        Edges to the same successor are merged into a single guard.
+        """
+        classes = self.alphabet_classes()
+        explicit = self.to_dfa(classes).minimize()
+        edges = {}
+        for state in explicit.states():
+            by_succ = {}
+            for cls in classes:
+                succ = explicit._transition(state, cls.witness())
+                by_succ.setdefault(succ, set()).update(cls.cubes)
+            edges[state] = tuple((Guard(c), s) for s, c in by_succ.items())
+        return SymbolicDFA(
+            start=explicit.start,
+            label=explicit._label,
+            transition=edges.__getitem__,
+            num_atoms=self.num_atoms,
+            outputs=self.outputs,
+        )
+
+    def find_word(self, label=True) -> Optional[Word]:
+        """Returns a word with the given label if one exists. O.w. None."""
+        return self.to_dfa().find_word(label)
+
+    def __eq__(self, other: SymbolicDFA) -> bool:
+        if not isinstance(other, SymbolicDFA):
+            return False
+        if self.num_atoms != other.num_atoms:
+            return False
+        classes = alphabet_classes(self.guards() | other.guards())
+        return self.to_dfa(classes) == other.to_dfa(classes)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            # Edges of the minimal DFA are unique as sets of letters, so
+            # are its alphabet classes. Cubes are not, so classes are
+            # summarized by their smallest letters (the witnesses) and
+            # sizes.
+            minimal = self.minimize()
+            classes = minimal.alphabet_classes()
+            summary = sorted((c.witness(), c.count(self.num_atoms))
+                             for c in classes)
+            explicit = minimal.to_dfa(classes)
+            _hash = hash((self.num_atoms, tuple(summary), explicit))
+            object.__setattr__(self, "_hash", _hash)  # Cache hash.
+        return self._hash
+
+    @boolean_only
+    def __invert__(self) -> SymbolicDFA:
+        label = memoize(lambda s: not self._label(s), maxsize=0)
+        return attr.evolve(self, label=label)
+
+    def _bin_op(self, other: SymbolicDFA, op) -> SymbolicDFA:
+        if self.num_atoms != other.num_atoms:
+            raise ValueError(f"{op} requires the same propositions.")
+
+        def transition(s):
+            return [(g1 & g2, (s1, s2))
+                    for g1, s1 in self.edges(s[0])
+                    for g2, s2 in other.edges(s[1])]
+
+        return SymbolicDFA(
+            start=(self.start, other.start),
+            label=lambda s: op(self._label(s[0]), other._label(s[1])),
+            transition=transition,
+            num_atoms=self.num_atoms,
+            outputs=self.outputs | other.outputs,
+        )
+
+    @boolean_only
+    def __xor__(self, other: SymbolicDFA) -> SymbolicDFA:
+        return self._bin_op(other, operator.xor)
+
+    @boolean_only
+    def __or__(self, other: SymbolicDFA) -> SymbolicDFA:
+        return self._bin_op(other, operator.or_)
+
+    @boolean_only
+    def __and__(self, other: SymbolicDFA) -> SymbolicDFA:
+        return self._bin_op(other, operator.and_)
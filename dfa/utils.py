@@ -1,16 +1,18 @@
+import bisect
 import funcy as fn
 import itertools
 import random
 from collections import deque, defaultdict
-from bidict import bidict
 
 from dfa import DFA, State, Letter
-from collections import defaultdict
+from dfa.dfa import evolve, ordered
+from dfa.stats import timed
 
 
 DFADict = dict[State, tuple[Letter, dict[Letter, State]]]
 
 
+@timed('dfa2dict')
 def dfa2dict(dfa_, *, reindex=False) -> tuple[DFADict, State]:
     dfa_.states()  # Explicitly compute states.
     if reindex:
@@ -60,6 +62,49 @@ def paths(dfa_, start, end=None, *, max_length=float('inf'), randomize=False):
         stack.extendleft(kids)
 
 
+def sample_paths(dfa_, start, end=None, *, max_length, num_samples=1,
+                 rng=None):
+    """Draws num_samples paths from start to end uniformly at random.
+
+    Paths are drawn (with replacement) from all paths of length at most
+    max_length, i.e., the paths generated by paths(...). If end is None,
+    all paths starting at start are considered.
+
+    Path counts are precomputed once, so each sample takes time
+    proportional to max_length. rng may be a random.Random or a seed.
+    """
+    import numpy as np
+    from dfa.counting import PathCounter, as_rng
+
+    if start != dfa_.start:  # Only states reachable from start matter.
+        dfa_ = evolve(dfa_, start=start)
+    compiled = dfa_.compile()
+    if end is None:
+        targets = np.ones(len(compiled), dtype=bool)
+    elif end not in compiled.state2idx:
+        raise ValueError("No paths from start to end.")
+    else:
+        targets = np.zeros(len(compiled), dtype=bool)
+        targets[compiled.state2idx[end]] = True
+    counter = PathCounter(compiled, targets)
+    start = compiled.start
+
+    totals = list(itertools.accumulate(
+        counter.count(start, n) for n in range(max_length + 1)
+    ))
+    if totals[-1] == 0:
+        raise ValueError("No paths from start to end.")
+
+    rng = as_rng(rng)
+    samples = []
+    for _ in range(num_samples):
+        rank = rng.randrange(totals[-1])
+        length = bisect.bisect_right(totals, rank)
+        offset = totals[length - 1] if length else 0
+        samples.append(counter.unrank(start, length, rank - offset))
+    return samples
+
+
 def find_word(lang: DFA):
     """Returns a word in the language of DFA or None if language empty."""
     return lang.find_word()
@@ -72,102 +117,367 @@ def words(lang: DFA, max_length=float('inf')):
     yield from fn.interleave(*paths_by_target)
 
 
+def _shared_inputs(dfa_a: DFA, dfa_b: DFA):
+    if dfa_a.inputs != dfa_b.inputs:
+        raise ValueError("Comparing DFAs requires shared inputs.")
+    return ordered(dfa_a.inputs)
+
+
+def _backtrack(parents, idx):
+    """Recovers word from (parent index, letter) pointers."""
+    word = []
+    while idx:  # Index 0 is the root.
+        idx, char = parents[idx]
+        word.append(char)
+    word.reverse()
+    return word
+
+
 def find_equiv_counterexample(dfa_a, dfa_b):
     """
     Returns None if DFAs are equivalent; if not, returns a counterexample.
+
+    Uses Hopcroft and Karp's union-find based algorithm, exploring pairs
+    of states in breadth first order. Pairs already known to be in the
+    same class are not revisited and the search stops at the first
+    distinguishing pair. The counterexample is thus a shortest one.
     """
-    return find_word(dfa_a ^ dfa_b)
+    inputs = _shared_inputs(dfa_a, dfa_b)
+    if dfa_a._label(dfa_a.start) != dfa_b._label(dfa_b.start):
+        return []
+
+    parent = {}
+
+    def find(node):
+        root = node
+        while (up := parent.get(root, root)) != root:
+            root = up
+        while node != root:  # Path compression.
+            parent[node], node = root, parent[node]
+        return root
+
+    parent[0, dfa_a.start] = (1, dfa_b.start)
+    pairs, parents = [(dfa_a.start, dfa_b.start)], [(None, None)]
+    queue = deque([0])
+    while queue:
+        idx = queue.popleft()
+        state_a, state_b = pairs[idx]
+        for char in inputs:
+            state_a2 = dfa_a._transition(state_a, char)
+            state_b2 = dfa_b._transition(state_b, char)
+            root_a, root_b = find((0, state_a2)), find((1, state_b2))
+            if root_a == root_b:
+                continue  # Already assumed equivalent.
+            if dfa_a._label(state_a2) != dfa_b._label(state_b2):
+                return _backtrack(parents, idx) + [char]
+            parent[root_a] = root_b
+            queue.append(len(pairs))
+            pairs.append((state_a2, state_b2))
+            parents.append((idx, char))
+    return None
 
 
 def find_subset_counterexample(smaller, bigger):
     """
     Returns None if smaller ⊆ bigger; if not, returns x ∈ smaller - bigger.
+
+    Performs a breadth first search over pairs of states, stopping at the
+    first pair accepted by smaller but rejected by bigger. The
+    counterexample is thus a shortest one.
+    """
+    inputs = _shared_inputs(smaller, bigger)
+
+    def is_counterexample(pair):
+        return smaller._label(pair[0]) and not bigger._label(pair[1])
+
+    start = (smaller.start, bigger.start)
+    if is_counterexample(start):
+        return []
+
+    pairs, parents, visited = [start], [(None, None)], {start}
+    queue = deque([0])
+    while queue:
+        idx = queue.popleft()
+        state_s, state_b = pairs[idx]
+        for char in inputs:
+            pair = (smaller._transition(state_s, char),
+                    bigger._transition(state_b, char))
+            if pair in visited:
+                continue
+            if is_counterexample(pair):
+                return _backtrack(parents, idx) + [char]
+            visited.add(pair)
+            queue.append(len(pairs))
+            pairs.append(pair)
+            parents.append((idx, char))
+    return None
+
+
+def enumerate_dfas(alphabet, outputs=(False, True), *, shard=0,
+                   num_shards=1, max_states=None):
+    """Enumerates all minimal DFAs over alphabet, up to isomorphism.
+
+    DFAs are generated in order of increasing size. Each is generated
+    exactly once, with states numbered in breadth first order, and only
+    the current candidate is kept in memory.
+
+    To split the work, e.g., across processes, each of num_shards
+    workers can pass its own shard index. The shards are disjoint and
+    together cover the full enumeration.
+    """
+    alphabet = list(alphabet)
+    if not 0 <= shard < num_shards:
+        raise ValueError("Require 0 <= shard < num_shards.")
+
+    candidate = 0
+    sizes = fn.count(start=1) if max_states is None \
+        else range(1, max_states + 1)
+    for num_states in sizes:
+        for table in _bfs_tables(num_states, len(alphabet)):
+            for labels in itertools.product(outputs, repeat=num_states):
+                candidate += 1
+                if candidate % num_shards != shard:
+                    continue
+                if len(set(partition(table, labels))) < num_states:
+                    continue  # Not minimal.
+                dfa_dict = {
+                    s: (labels[s], dict(zip(alphabet, row)))
+                    for s, row in enumerate(table)
+                }
+                yield dict2dfa(dfa_dict, start=0, outputs=outputs)
+
+
+def _bfs_tables(num_states, num_inputs):
+    """Generates all transition tables with states numbered in BFS order.
+
+    In row major order, each state must first appear after all smaller
+    states and before its own row. These are exactly the tables of
+    accessible DFAs, each numbered by a breadth first search from 0.
     """
-    return find_word(~bigger & smaller)
+    size = num_states * num_inputs
+    flat = [0] * size
+
+    def extend(pos, discovered):
+        if pos == size:
+            if discovered == num_states:
+                yield [flat[i:i + num_inputs]
+                       for i in range(0, size, num_inputs)]
+            return
+        if pos % num_inputs == 0 and pos // num_inputs >= discovered:
+            return  # Current state was never reached.
+        if num_states - discovered > size - pos:
+            return  # Not enough transitions left to reach all states.
+        for state in range(min(discovered + 1, num_states)):
+            flat[pos] = state
+            yield from extend(pos + 1, discovered + (state == discovered))
+
+    if num_inputs == 0:  # No transitions. Only the start state.
+        if num_states == 1:
+            yield [[]]
+        return
+    yield from extend(0, 1)
+
+
+def tabulate(dfa_: DFA) -> tuple[list, list, list[list[int]], list]:
+    """Returns the (states, inputs, transition table, labels) of dfa_.
+
+    States and inputs are replaced by their indices in the table. The
+    start state need not have index 0, e.g., for loaded DFAs.
+    """
+    if dfa_._compiled is not None:  # Reuse already explored table.
+        compiled = dfa_._compiled
+        return list(compiled.states), list(compiled.inputs), \
+            compiled.table.tolist(), compiled.labels.tolist()
+
+    dfa_.states()  # Explicitly compute states.
+    states = list(dfa_._states)
+    inputs = ordered(dfa_.inputs)
+    index = {s: i for i, s in enumerate(states)}
+    trans = dfa_._transition
+    table = [[index[trans(s, a)] for a in inputs] for s in states]
+    labels = [dfa_._label(s) for s in states]
+    return states, inputs, table, labels
+
+
+def partition(table: list[list[int]], labels: list) -> list[int]:
+    """Computes the coarsest label respecting congruence of a table.
 
+    Uses Hopcroft's algorithm over a refinable partition, i.e., states
+    are stored so that each block (and its marked part) is contiguous.
+    Runs in O(n k log n) time for n states and k letters.
 
-def enumerate_dfas(alphabet, outputs=(False, True)):
-    dfas = _enumerate_dfas(alphabet, outputs)
-    dfas = map(minimize, dfas)
-    yield from fn.distinct(dfas)
+    Returns the block index of each state.
+    """
+    n = len(table)
+    k = len(table[0]) if n else 0
+
+    # Initial partition groups states by label.
+    groups = {}
+    for s, label in enumerate(labels):
+        groups.setdefault(label, []).append(s)
+    elems, first, end, block = [], [], [], [0] * n
+    for b, group in enumerate(groups.values()):
+        first.append(len(elems))
+        elems.extend(group)
+        end.append(len(elems))
+        for s in group:
+            block[s] = b
+    loc = [0] * n
+    for i, s in enumerate(elems):
+        loc[s] = i
+    mid = first[:]  # Marked elements of block b are elems[first[b]:mid[b]].
+
+    # Inverse transitions in compressed sparse row form, per letter.
+    inverse = []
+    for a in range(k):
+        offsets = [0] * (n + 1)
+        for row in table:
+            offsets[row[a] + 1] += 1
+        for t in range(n):
+            offsets[t + 1] += offsets[t]
+        sources, pos = [0] * n, offsets[:-1]
+        for s, row in enumerate(table):
+            t = row[a]
+            sources[pos[t]] = s
+            pos[t] += 1
+        inverse.append((offsets, sources))
+
+    # Every block but the largest is initially a splitter.
+    largest = max(range(len(first)), key=lambda b: end[b] - first[b],
+                  default=None)
+    work = [(b, a) for b in range(len(first)) if b != largest
+            for a in range(k)]
+
+    while work:
+        b, a = work.pop()
+        offsets, sources = inverse[a]
+
+        # Mark predecessors of the splitter.
+        touched = []
+        for t in elems[first[b]:end[b]]:
+            for s in sources[offsets[t]:offsets[t + 1]]:
+                c = block[s]
+                m = mid[c]
+                if loc[s] < m:
+                    continue  # Already marked.
+                if m == first[c]:
+                    touched.append(c)
+                other, i = elems[m], loc[s]
+                elems[m], elems[i] = s, other
+                loc[s], loc[other] = m, i
+                mid[c] = m + 1
+
+        # Split touched blocks into marked and unmarked parts.
+        for c in touched:
+            f, m, e = first[c], mid[c], end[c]
+            mid[c] = f
+            if m == e:
+                continue  # Every element marked. No split.
+
+            # The smaller part becomes the new block.
+            new = len(first)
+            if m - f <= e - m:
+                first.append(f)
+                end.append(m)
+                first[c] = mid[c] = m
+            else:
+                first.append(m)
+                end.append(e)
+                end[c] = m
+            mid.append(first[new])
+            for s in elems[first[new]:end[new]]:
+                block[s] = new
+
+            # Hopcroft's trick: Only the smaller half needs to be added.
+            # If (c, a) is pending, it now refers to the other half.
+            work.extend((new, a2) for a2 in range(k))
+    return block
+
+
+def _start_blocks(job) -> list[int]:
+    """Blocks of the start states in the disjoint union of tables."""
+    table, labels, starts = job
+    block = partition(table, labels)
+    return [block[s] for s in starts]
+
+
+def language_ids(dfas, *, processes: int = 1) -> list[int]:
+    """Returns ids such that DFAs are equivalent iff their ids match.
+
+    DFAs are grouped by alphabet. Each group is minimized at once by a
+    single partition refinement over the disjoint union of the DFAs.
+    If processes > 1, groups are refined in a process pool. Only the
+    transition tables, labels and start states are sent to workers.
+
+    Ids are numbered in order of first occurrence.
+    """
+    dfas = list(dfas)
+    groups = defaultdict(list)
+    for i, dfa_ in enumerate(dfas):
+        groups[dfa_.inputs].append(i)
+
+    jobs = []
+    for inputs, members in groups.items():
+        order = ordered(inputs)
+        table, labels, starts = [], [], []
+        for i in members:
+            states, letters, sub_table, sub_labels = tabulate(dfas[i])
+            offset = len(table)
+            col = {a: c for c, a in enumerate(letters)}
+            cols = [col[a] for a in order]
+            table.extend([offset + row[c] for c in cols] for row in sub_table)
+            labels.extend(sub_labels)
+            starts.append(offset + states.index(dfas[i].start))
+        jobs.append((table, labels, starts))
+
+    if processes > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(min(processes, len(jobs))) as pool:
+            results = list(pool.map(_start_blocks, jobs))
+    else:
+        results = list(map(_start_blocks, jobs))
 
+    keys = [None] * len(dfas)  # (alphabet, block) of each DFA's start.
+    for (inputs, members), blocks in zip(groups.items(), results):
+        for i, b in zip(members, blocks):
+            keys[i] = (inputs, b)
+    ids = {}
+    return [ids.setdefault(key, len(ids)) for key in keys]
 
-def _enumerate_dfas(alphabet, outputs):
-    for num_states in fn.count(start=1):
-        transitions = defaultdict(dict)
-        # Create an iterator of all possible adjacency matrices.
-        adj_list_gnr = itertools.product(range(num_states), repeat=num_states)
-        # Generate all possible letter -> adjacency matrix maps.
-        total_gnr = itertools.product(adj_list_gnr, repeat=len(alphabet))
 
-        #total_gnr = list(total_gnr); breakpoint()
-        for adjacency_lists in total_gnr:
-            # Construct the DFA transitions based on adjacency lists.
-            for char, adj_list in zip(alphabet, adjacency_lists):
-                for state_idx, resulting_state in enumerate(adj_list):
-                    transitions[state_idx][char] = resulting_state
+def group_by_language(dfas, *, processes: int = 1) -> list[list[int]]:
+    """Partitions the indices of dfas into language equivalence classes.
 
-            # Generate all possible permutations of accepting states.
-            for accepting in itertools.product(outputs, repeat=num_states):
-                dfa_dict = {}
-                for state, label in enumerate(accepting):
-                    dfa_dict[state] = (label, transitions[state])
+    See language_ids.
+    """
+    classes = defaultdict(list)
+    for i, id_ in enumerate(language_ids(dfas, processes=processes)):
+        classes[id_].append(i)
+    return list(classes.values())
 
-                assert len(dfa_dict) == num_states
-                # Generate all possible start states.
-                for start in range(num_states):
-                    yield dict2dfa(dfa_dict, start=state, outputs=outputs)
 
+def quotient_dict(tabulated, block: list[int],
+                  start: State) -> tuple[DFADict, int]:
+    """Merges the states of a tabulated DFA (see tabulate) by block.
 
+    Returns the merged DFA as a dict over blocks and the start's block.
+    """
+    states, inputs, table, labels = tabulated
+    dfa_dict = {}
+    for s, b in enumerate(block):
+        if b in dfa_dict:
+            continue
+        trans = {a: block[t] for a, t in zip(inputs, table[s])}
+        dfa_dict[b] = (labels[s], trans)
+    return dfa_dict, block[states.index(start)]
+
+
+@timed('minimize')
 def minimize(orig: DFA):
     """Minimize a DFA using Hopcroft's algorithm."""
-    states = orig.states()
-
-    # Group states by label.
-    groups = fn.group_by(orig._label, states)
-    groups = fn.walk_values(frozenset, groups)
-    groups = bidict(groups).inv
-
-    p_part = [frozenset(grp) for grp in groups]
-    w_part = set(p_part)
-    while len(w_part) > 0:
-        curr = w_part.pop()
-        for char in orig.inputs:
-            new_p_part = set()
-            x_set = {s for s in states if orig._transition(s, char) in curr}
-            for y_set in p_part:  # Try to shatter equivalence classes.
-                intersect_set = y_set & x_set
-                diff_set = y_set - x_set
-
-                if intersect_set and diff_set:  # Discovered split.
-                    new_p_part.add(intersect_set)
-                    new_p_part.add(diff_set)
-
-                    if y_set in w_part:
-                        w_part.remove(y_set)
-                        w_part.add(intersect_set)
-                        w_part.add(diff_set)
-                    elif len(intersect_set) <= len(diff_set):
-                        w_part.add(intersect_set)
-                    else:
-                        w_part.add(diff_set)
-                else:
-                    new_p_part.add(y_set)
-            p_part = new_p_part
-
-    # Create mapping from states to representative states of equivalence class.
-    state2rep = {}
-    for grp in p_part:
-        rep = orig.start if (orig.start in grp) else fn.first(grp)
-        state2rep.update((s, rep) for s in grp)
-
-    return DFA(
-        start=orig.start,
-        inputs=orig.inputs,
-        outputs=orig.outputs,
-        label=orig._label,
-        transition=lambda s, c: state2rep[orig._transition(s, c)]
-    ).normalize()
+    _, _, table, labels = tabulated = tabulate(orig)
+    block = partition(table, labels)
+    return dict2dfa(*quotient_dict(tabulated, block, orig.start)).normalize()
 
 
 def min_distance_to_accept_by_state(d: DFA):
@@ -176,7 +486,22 @@ def min_distance_to_accept_by_state(d: DFA):
 
     Note: If a state cannot reach an accepting state, the distance
           is taken to be infinity.
+
+    Uses the DFA's cached reverse transition index if numpy is available.
     """
+    oo = float('inf')
+    try:
+        compiled = d.compile()
+    except ImportError:
+        return _min_distance_to_accept_by_state(d)
+
+    distances = compiled.graph().distance_to_accept.tolist()
+    return defaultdict(lambda: oo, {
+        s: dist for s, dist in zip(compiled.states, distances) if dist >= 0
+    })
+
+
+def _min_distance_to_accept_by_state(d: DFA):
     # Construct inverse transition function.
     inv_transition = defaultdict(set)
     for state in d.states():
@@ -185,9 +510,9 @@ def min_distance_to_accept_by_state(d: DFA):
             inv_transition[state2].add((state, token))
 
     # BFS from the accepting states to the start state.
-    oo = -float('inf')
+    oo = float('inf')
     queue = deque([s for s in d.states() if d._label(s)])
-    depths = defaultdict(lambda: -oo, {s: 0 for s in queue})
+    depths = defaultdict(lambda: oo, {s: 0 for s in queue})
     while queue:
         state = queue.pop()
         depth = depths[state]
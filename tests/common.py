@@ -0,0 +1,30 @@
+"""DFAs shared by several test modules."""
+import hypothesis.strategies as st
+
+from dfa import DFA
+from dfa.utils import dict2dfa
+
+
+def count_mod(n=4, inputs=(0, 1), outputs=None):
+    """Counts the last letter of inputs modulo n.
+
+    Accepts when the count is n - 1. If outputs are given, the count
+    itself is the label.
+    """
+    return DFA(
+        start=0,
+        inputs=inputs,
+        label=(lambda s: s == n - 1) if outputs is None else (lambda s: s),
+        transition=lambda s, c: (s + (c == inputs[-1])) % n,
+        outputs={True, False} if outputs is None else outputs,
+    )
+
+
+def random_dfa(data, n_max=8, k=2, outputs=(False, True)):
+    """Draws a DFA over inputs range(k) with at most n_max states."""
+    n = data.draw(st.integers(1, n_max))
+    dfa_dict = {s: (
+        data.draw(st.sampled_from(outputs)),
+        {a: data.draw(st.integers(0, n - 1)) for a in range(k)}
+    ) for s in range(n)}
+    return dict2dfa(dfa_dict, start=0, outputs=outputs)
@@ -0,0 +1,126 @@
+import operator
+
+import hypothesis.strategies as st
+from hypothesis import given, settings
+
+import dfa.compiled
+from dfa import DFA
+from dfa.compiled import product
+from dfa.utils import dict2dfa, dfa2dict
+
+from common import count_mod, random_dfa
+
+
+@given(st.lists(st.integers(0, 1)))
+def test_compiled_matches_dfa(word):
+    dfa = count_mod()
+    compiled = dfa.compile()
+    assert compiled.label(word) == dfa.label(word)
+    assert compiled.transition(word) == dfa.transition(word)
+    assert list(compiled.trace(word)) == list(dfa.trace(word))
+    assert compiled.transduce(word) == dfa.transduce(word)
+    assert compiled.transition(word, start=2) == dfa.transition(word, start=2)
+
+
+def test_compile_table():
+    dfa = count_mod()
+    compiled = dfa.compile()
+    assert dfa.compile() is compiled  # Cached.
+    assert compiled.table.shape == (4, 2)
+    assert compiled.table.dtype.name == 'int32'
+    assert compiled.inputs == (0, 1)
+    assert compiled.states[compiled.start] == 0
+    assert compiled.labels.tolist() == [False, False, False, True]
+    assert dfa.advance((1,))._compiled is None
+
+
+def test_compile_moore():
+    dfa_dict = {
+        'a': ((1, 2), {'x': 'b', 'y': 'a'}),
+        'b': (None, {'x': 'a', 'y': 'b'}),
+    }
+    dfa = dict2dfa(dfa_dict, start='a')
+    compiled = dfa.compile()
+    assert compiled.labels.dtype == object
+    for word in ['', 'x', 'xy', 'xxy', 'yyx']:
+        assert compiled.label(word) == dfa.label(word)
+        assert compiled.transduce(word) == dfa.transduce(word)
+
+
+@given(st.lists(st.lists(st.integers(0, 1), max_size=10), max_size=20))
+def test_batch(words):
+    dfa = count_mod()
+    compiled = dfa.compile()
+    labels = compiled.label_batch(words)
+    assert labels.tolist() == [dfa.label(w) for w in words]
+
+    states = compiled.transition_batch(words, start=1)
+    expected = [dfa.transition(w, start=1) for w in words]
+    assert [compiled.states[s] for s in states] == expected
+
+    cols, lengths = compiled.encode_words(words)
+    assert (compiled.label_batch(cols, lengths) == labels).all()
+
+
+@settings(max_examples=100)
+@given(st.data())
+def test_product(data):
+    dfa1, dfa2 = random_dfa(data), random_dfa(data)
+    lazy = dfa1 & dfa2
+    compiled = product(dfa1.compile(), dfa2.compile(), operator.and_)
+    assert len(compiled) == len(lazy.states())
+    assert compiled.to_dfa() == lazy
+
+    minimal = product(dfa1.compile(), dfa2.compile(), operator.and_,
+                      minimize=True)
+    assert len(minimal) == len(lazy.minimize().states())
+    assert minimal.to_dfa() == lazy
+
+    # Operators keep pair states, whether or not operands are compiled.
+    for op in (operator.and_, operator.or_, operator.xor):
+        flat = product(dfa1.compile(), dfa2.compile(), op).to_dfa()
+        assert flat.states() == set(range(len(flat.states())))
+        assert flat == op(dict2dfa(*dfa2dict(dfa1)), dfa2)
+        assert op(dfa1, dfa2).states() == lazy.states()
+        assert op(dfa1, dfa2)._compiled is None
+
+
+@settings(max_examples=20)
+@given(st.data())
+def test_sparse_product(data):
+    outputs = ('a', 'b', 'c')
+    dfa1 = random_dfa(data, outputs=outputs)
+    dfa2 = random_dfa(data, outputs=outputs)
+    lazy = dfa1._bin_op(dfa2, max)
+
+    compiled = dfa.compiled
+    limit = compiled.DENSE_PRODUCT_LIMIT
+    try:
+        compiled.DENSE_PRODUCT_LIMIT = 0
+        sparse = product(dfa1.compile(), dfa2.compile(), max)
+    finally:
+        compiled.DENSE_PRODUCT_LIMIT = limit
+    assert sparse.to_dfa() == lazy
+
+
+def test_product_few_reachable_pairs():
+    import tracemalloc
+
+    def chain(n):
+        return DFA(
+            start=0,
+            inputs={0, 1},
+            label=lambda s: s == n - 1,
+            transition=lambda s, c: min(s + c, n - 1),
+        ).compile()
+
+    left = chain(4000)
+    tracemalloc.start()
+    try:
+        result = product(left, left, operator.and_)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(result) == 4000
+    assert result.label([1] * 3999) and not result.label([1] * 3998)
+    assert peak < 1 << 22  # Far below 4000 * 4000 pairs.
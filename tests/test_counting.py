@@ -0,0 +1,63 @@
+import itertools
+import random
+
+import pytest
+
+from dfa import DFA
+from dfa.counting import WordCounter, count_words
+
+from common import count_mod
+
+
+def brute_force(dfa, length):
+    words = itertools.product(sorted(dfa.inputs), repeat=length)
+    return [w for w in words if dfa.label(w)]
+
+
+def test_count_words():
+    dfa = count_mod()
+    counts = count_words(dfa, 10)
+    assert counts == [len(brute_force(dfa, n)) for n in range(11)]
+    assert count_words(dfa, 10, label=False)[10] == 2**10 - counts[10]
+    assert count_words(dfa, 10, modulus=7) == [c % 7 for c in counts]
+
+
+def test_big_counts():
+    dfa = DFA(
+        start=0,
+        inputs=range(10),
+        label=lambda s: s == 0,
+        transition=lambda s, c: (s + c) % 3,
+    )
+    counter = WordCounter(dfa)
+    # Exactly a third of all words (rounded) have digit sum 0 mod 3.
+    assert counter.count(100) == (10**100 + 2) // 3
+    word = counter.unrank(100, 10**99)
+    assert counter.rank(word) == 10**99
+    assert dfa.label(word)
+
+
+def test_rank_unrank():
+    dfa = count_mod()
+    counter = WordCounter(dfa)
+    for length in range(8):
+        words = brute_force(dfa, length)
+        assert [counter.unrank(length, i) for i in range(len(words))] \
+            == words
+        assert [counter.rank(w) for w in words] == list(range(len(words)))
+    with pytest.raises(IndexError):
+        counter.unrank(3, 1)
+    with pytest.raises(ValueError):
+        counter.rank((1, 1))
+
+
+def test_sample():
+    dfa = count_mod()
+    counter = WordCounter(dfa)
+    samples = counter.sample(7, num_samples=3000, rng=random.Random(0))
+    assert all(dfa.label(w) and len(w) == 7 for w in samples)
+    # 36 words of length 7 have 3 or 7 ones. Each should appear.
+    assert len(set(samples)) == counter.count(7) == 36
+    assert samples == counter.sample(7, num_samples=3000, rng=0)
+    with pytest.raises(ValueError):
+        counter.sample(0)
@@ -1,8 +1,11 @@
+import attr
 import hypothesis.strategies as st
 from hypothesis import given
 
 from dfa import DFA
 
+from common import count_mod
+
 
 @given(st.lists(st.booleans()))
 def test_example1(word):
@@ -106,3 +109,240 @@ def test_dill():
         label=lambda s: (s % 4) == 3,
         transition=lambda s, c: (s + c) % 4,
     ))
+
+
+def test_canonical_form_cached(monkeypatch):
+    import dfa.utils
+
+    calls = []
+    minimize = dfa.utils.minimize
+    monkeypatch.setattr(dfa.utils, 'minimize',
+                        lambda d: calls.append(d) or minimize(d))
+
+    dfa1, dfa2 = count_mod(4), count_mod(8)
+    assert len({dfa1, dfa2, dfa1, dfa2}) == 2
+    assert dfa1 != dfa2
+    dfa1.to_int()
+    dfa2.minimize()
+    assert len(calls) == 2
+
+    assert dfa1.minimize() is dfa1.minimize()
+    assert dfa1.minimize().normalize() is dfa1.minimize()
+    assert hash(dfa1.minimize()) == hash(dfa1)
+    assert len(calls) == 2
+
+
+def test_moore_equality():
+    def mod_counter(n, m):
+        return DFA(
+            start=0,
+            inputs={0, 1},
+            outputs=range(m),
+            label=lambda s: s % m,
+            transition=lambda s, c: (s + c) % n,
+        )
+
+    assert mod_counter(4, 2) == mod_counter(2, 2)
+    assert hash(mod_counter(4, 2)) == hash(mod_counter(2, 2))
+    assert mod_counter(4, 4) != mod_counter(2, 2)
+
+
+def test_int_encoding_batch():
+    from dfa.codec import from_ints, to_ints
+
+    langs = [count_mod(n) for n in range(1, 20)]
+    langs.extend(~lang for lang in list(langs))
+    encodings = to_ints(langs)
+    assert encodings == [lang.to_int() for lang in langs]
+    assert from_ints(encodings, [0, 1]) == langs
+
+    # Single letter alphabets and explicit input orders.
+    lang = count_mod(3, inputs=('a',))
+    assert DFA.from_int(lang.to_int(), ['a']) == lang
+    lang = count_mod(3, inputs=('a', 'b'))
+    assert DFA.from_int(lang.to_int(['b', 'a']), ['b', 'a']) == lang
+
+
+def test_sink_short_circuit():
+    from itertools import chain, repeat
+
+    calls = []
+
+    def transition(s, c):
+        calls.append((s, c))
+        return min(s + c, 3)
+
+    dfa = DFA(
+        start=0,
+        inputs={0, 1},
+        label=lambda s: s == 3,
+        transition=transition,
+    )
+    word = [1, 1, 1] + [0, 1] * 1000
+    assert dfa.label(word)
+    assert dfa.transition(iter(word)) == 3
+    assert len(calls) == 5  # (0, 1), (1, 1), (2, 1), (3, 0), (3, 1).
+
+    # Works for (infinite) iterators.
+    assert dfa.label(chain([1, 1, 1], repeat(1)))
+    expected = (False, False, False) + (True,) * 2000
+    assert dfa.transduce(word) == expected
+    assert dfa.transduce(iter(word)) == expected
+    assert list(dfa.trace(word)) == [0, 1, 2] + [3] * 2001
+    assert len(calls) == 5
+
+    machine = dfa.run(label=True)
+    assert next(machine) is False
+    assert [machine.send(1) for _ in range(5)] == [False, False, True,
+                                                   True, True]
+
+    compiled = dfa.compile()
+    assert compiled.sinks.tolist() == [False, False, False, True]
+    assert compiled.label(chain([1, 1, 1], repeat(1)))
+    assert compiled.transduce(word) == expected
+
+
+def test_advance_canonical():
+    count_mod4 = DFA(
+        start=0,
+        inputs={0, 1, 2},
+        label=lambda s: s % 4 == 3,
+        transition=lambda s, c: (s + c) % 8,  # Redundant states.
+    )
+    words = [(), (1,), (1, 2), (2, 2), (1, 1, 1, 1, 2)]
+    for word in words:
+        interned = count_mod4.advance(word, canonical=True)
+        assert interned == count_mod4.advance(word)
+        assert interned._hash is not None
+        assert hash(interned) == hash(count_mod4.advance(word))
+        assert len(interned.states()) == 4
+    assert count_mod4._canonical is not None
+
+    # Words reaching equivalent states share a single instance.
+    assert count_mod4.advance((1,), canonical=True) \
+        is count_mod4.advance((2, 2, 1), canonical=True)
+    assert count_mod4.advance((1,), canonical=True) \
+        is not count_mod4.advance((2,), canonical=True)
+
+    # Advancing interned DFAs stays within the cache.
+    interned = count_mod4.advance((1,), canonical=True)
+    assert interned.advance((1, 1), canonical=True) \
+        is count_mod4.advance((1, 2), canonical=True)
+    assert interned.advance((1,), start=interned.start, canonical=True) \
+        is count_mod4.advance((2,), canonical=True)
+
+
+def test_progressions_nonzero_start():
+    from dfa.progression import progressions
+
+    compiled = attr.evolve(
+        DFA(
+            start=0,
+            inputs={0, 1},
+            label=lambda s: s == 2,
+            transition=lambda s, c: min(s + c, 2),
+        ).compile(),
+        start=1,
+    )
+    dfa1 = compiled.to_dfa()
+    progs = progressions(dfa1)
+    assert progs.quotient.start == progs.block[dfa1.start]
+    assert progs.quotient.label([1])
+    assert dfa1.advance((), canonical=True) == dfa1
+
+
+def test_pickle():
+    import pickle
+    import subprocess
+    import sys
+
+    import dill
+
+    # Pickled field by field, so infinite DFAs and states are kept.
+    counter = DFA(
+        start=0,
+        inputs={0, 1},
+        label=lambda s: s > 2,
+        transition=lambda s, c: s + c,
+    )
+    loaded = dill.loads(dill.dumps(counter))
+    assert loaded.transition([1, 0, 1]) == counter.transition([1, 0, 1])
+
+    # Hashes of non-Boolean DFAs are recomputed in each process.
+    moore = DFA(
+        start='a',
+        inputs={0, 1},
+        outputs={'x', 'y'},
+        label=lambda s: 'x' if s == 'a' else 'y',
+        transition=lambda s, c: 'b' if c else s,
+    )
+    code = """
+import sys, dill
+from dfa import DFA
+moore = DFA(start='a', inputs={0, 1}, outputs={'x', 'y'},
+            label=lambda s: 'x' if s == 'a' else 'y',
+            transition=lambda s, c: 'b' if c else s)
+hash(moore)
+sys.stdout.buffer.write(dill.dumps(moore))
+"""
+    data = subprocess.run([sys.executable, '-c', code], check=True,
+                          capture_output=True).stdout
+    remote = dill.loads(data)
+    assert remote.start == 'a' and remote == moore
+    assert len({remote, moore}) == 1
+
+    # Tables are opt-in: Compiled DFAs pickle without any functions.
+    compiled = pickle.loads(pickle.dumps(moore.compile()))
+    assert compiled.to_dfa() == moore
+    assert compiled.to_dfa().start == 'a'
+
+
+def test_copy_keeps_states():
+    import copy
+
+    dfa = DFA(
+        start='a',
+        inputs={0, 1},
+        label=lambda s: s == 'b',
+        transition=lambda s, c: 'b' if c else s,
+    )
+    dfa.states()
+    for copied in (copy.copy(dfa), copy.deepcopy(dfa)):
+        assert copied.start == 'a'
+        assert copied.states() == {'a', 'b'}
+        assert copied == dfa and copied.label([0, 1])
+    assert copy.deepcopy([dfa, dfa])[0].start == 'a'
+
+
+def test_eq_unsortable_inputs():
+    def make():
+        # Equal but distinct letters, so ids differ between the DFAs.
+        a, b = (1, 'x'), ('y', 2)
+        return DFA(
+            start=0,
+            inputs={a, b},
+            label=lambda s: s == 1,
+            transition=lambda s, c: (s + (c == a)) % 3,
+        )
+
+    dfa1, dfa2 = make(), make()
+    assert dfa1 == dfa2
+    dfa1.minimize(), dfa2.minimize()
+    assert dfa1 == dfa2 and hash(dfa1) == hash(dfa2)
+    assert dfa1 != ~dfa2
+
+
+def test_int_encoding_unsortable_inputs():
+    import pytest
+
+    dfa = DFA(
+        start=0,
+        inputs={(1, 'x'), ('y', 2)},
+        label=lambda s: s == 1,
+        transition=lambda s, c: min(s + 1, 2),
+    )
+    with pytest.raises(TypeError):
+        dfa.to_int()  # Would otherwise depend on object ids.
+    assert dfa.to_int([(1, 'x'), ('y', 2)]) \
+        == dfa.to_int([(1, 'x'), ('y', 2)])
+    assert hash(dfa) == hash(dfa.minimize())
@@ -1,7 +1,8 @@
+import io
 from tempfile import TemporaryDirectory
 
 import dfa
-from dfa.draw import write_dot
+from dfa.draw import dump_dot, write_dot
 
 
 def test_draw_smoke():
@@ -13,3 +14,37 @@ def test_draw_smoke():
     )
     with TemporaryDirectory() as path:
         write_dot(dfa1, f"{path}/test.dot")
+
+
+def dot(dfa_, **kwargs):
+    f = io.StringIO()
+    dump_dot(dfa_, f, **kwargs)
+    return f.getvalue().splitlines()
+
+
+def test_merge_and_collapse():
+    # Reads a 1 (accept), reads a 2 (reject forever) or else waits.
+    dfa1 = dfa.DFA(
+        start='wait',
+        inputs={0, 1, 2},
+        label=lambda s: s == 'yes',
+        transition=lambda s, c: s if s != 'wait' else
+        ('wait', 'yes', 'no')[c],
+    )
+    lines = dot(dfa1)
+    assert lines[0] == 'digraph G {' and lines[-1] == '}'
+    edges = [line for line in lines if '->' in line]
+    assert len(edges) == 1 + 3 + 1 + 1  # Start, wait, yes, no.
+    assert '3 -> 3 [label="0, 1, 2"];' in lines
+
+    lines = dot(dfa1, collapse_sinks=True)
+    assert len([line for line in lines if '->' in line]) == 1 + 3
+    assert sum('label="False"' in line for line in lines) == 1
+
+    lines = dot(dfa1, hide_rejecting_sinks=True)
+    assert not any('no' in line for line in lines)
+    assert len([line for line in lines if '->' in line]) == 1 + 2 + 1
+
+    quoted = dfa.DFA(start='"a"\\', inputs={0}, label=lambda s: True,
+                     transition=lambda s, c: s)
+    assert r'1 [label="\"a\"\\\n---\nTrue"];' in dot(quoted)
@@ -0,0 +1,61 @@
+import hypothesis.strategies as st
+import numpy as np
+from hypothesis import given, settings
+
+from dfa import DFA
+from dfa.utils import _min_distance_to_accept_by_state
+
+from common import random_dfa
+
+
+def reachable(compiled, state):
+    seen, stack = {state}, [state]
+    while stack:
+        for succ in compiled.table[stack.pop()].tolist():
+            if succ not in seen:
+                seen.add(succ)
+                stack.append(succ)
+    return seen
+
+
+@settings(max_examples=100)
+@given(st.data())
+def test_graph_queries(data):
+    dfa = random_dfa(data, n_max=10)
+    compiled = dfa.compile()
+    graph = compiled.graph()
+    assert compiled.graph() is graph
+
+    expected = _min_distance_to_accept_by_state(dfa)
+    for s, dist in zip(compiled.states, graph.distance_to_accept):
+        assert (dist if dist >= 0 else float('inf')) == expected[s]
+    assert (graph.live == (graph.distance_to_accept >= 0)).all()
+
+    reach = [reachable(compiled, s) for s in range(len(compiled))]
+    labels = compiled.labels.tolist()
+    for s in range(len(compiled)):
+        assert set(graph.predecessors(s).tolist()) \
+            == {p for p in range(len(compiled)) if s in compiled.table[p]}
+        assert graph.sinks[s] == (reach[s] == {s})
+        assert graph.traps[s] == (len({labels[t] for t in reach[s]}) == 1)
+        rejecting = any(not labels[t] for t in reach[s])
+        assert (graph.distance_to_reject[s] >= 0) == rejecting
+        for t in reach[s]:
+            mutual = s in reach[t]
+            assert (graph.sccs[s] == graph.sccs[t]) == mutual
+            assert graph.sccs[t] <= graph.sccs[s]
+
+
+def test_distance_batch():
+    dfa = DFA(
+        start=0,
+        inputs={0, 1},
+        label=lambda s: s == 3,
+        transition=lambda s, c: min(s + c, 3),
+    )
+    graph = dfa.compile().graph()
+    states = np.array([0, 1, 2, 3, 3])
+    assert graph.distance_to_accept[states].tolist() == [3, 2, 1, 0, 0]
+    assert graph.distance_to_reject[states].tolist() == [0, 0, 0, -1, -1]
+    assert graph.sinks.tolist() == [False, False, False, True]
+    assert graph.sccs.tolist() == [3, 2, 1, 0]
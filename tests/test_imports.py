@@ -0,0 +1,83 @@
+import subprocess
+import sys
+
+# Modules that only helpers need. Loading DFAs and querying labels
+# must not import them.
+HEAVY = ['dfa.utils', 'dfa.compiled', 'funcy', 'numpy', 'pydot', 'random',
+         'bisect']
+# Modules that import dfa may load besides attrs and its dependencies.
+ALLOWED = {'__future__', 'array', 'dfa', 'dfa.dfa', 'dfa.memo', 'dfa.stats'}
+# Bound on the time spent executing dfa's own modules (microseconds).
+BUDGET_US = 30_000
+
+QUERY = """
+import sys
+from dfa import DFA
+
+dfa = DFA(start=0, inputs={0, 1}, label=lambda s: s == 1,
+          transition=lambda s, c: (s + c) % 2)
+assert dfa.label([1, 0]) and not dfa.label([1, 1])
+print(','.join(m for m in HEAVY if m in sys.modules))
+"""
+
+
+def test_query_path_imports():
+    result = subprocess.run(
+        [sys.executable, '-c', QUERY.replace('HEAVY', repr(HEAVY))],
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == ''
+
+
+def test_import_time_budget():
+    own = []
+    for _ in range(3):  # Best of three to reduce noise.
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import dfa'],
+            capture_output=True, text=True, check=True,
+        )
+        # Lines look like "import time: self | cumulative | name".
+        own.append(sum(
+            int(line.split('|')[0].split(':')[1])
+            for line in result.stderr.splitlines()
+            if line.startswith('import time:') and 'cumulative' not in line
+            and line.split('|')[2].strip().split('.')[0] == 'dfa'
+        ))
+    assert min(own) < BUDGET_US
+
+
+def test_import_footprint():
+    code = """
+import sys
+import attr
+before = set(sys.modules)
+import dfa
+print(','.join(sorted(set(sys.modules) - before)))
+"""
+    result = subprocess.run([sys.executable, '-c', code],
+                            capture_output=True, text=True, check=True)
+    assert set(result.stdout.strip().split(',')) <= ALLOWED
+
+
+def test_lazy_attributes():
+    import dfa
+    from dfa.utils import dfa2dict
+    assert dfa.dfa2dict is dfa2dict
+    assert 'dict2dfa' in dir(dfa)
+
+
+def test_lazy_submodules():
+    code = """
+import sys
+import dfa
+assert 'dfa.utils' not in sys.modules
+assert dfa.utils.dfa2dict is dfa.dfa2dict
+assert dfa.draw.write_dot
+try:
+    dfa.missing
+except AttributeError:
+    pass
+else:
+    raise AssertionError
+"""
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -0,0 +1,75 @@
+from tempfile import TemporaryDirectory
+
+import attr
+import numpy as np
+import pytest
+
+from dfa import DFA
+from dfa.io import load, load_compiled, save
+from dfa.utils import dict2dfa
+
+
+def test_save_load_boolean():
+    dfa1 = DFA(
+        start=0,
+        inputs={0, 1},
+        label=lambda s: (s % 4) == 3,
+        transition=lambda s, c: (s + c) % 4,
+    )
+    with TemporaryDirectory() as path:
+        save(dfa1, f"{path}/dfa1.bin")
+        dfa2 = load(f"{path}/dfa1.bin")
+        assert isinstance(dfa2.compile().table, np.memmap)
+        assert dfa2.compile().labels.dtype == bool
+        assert dfa2.states() == {0, 1, 2, 3}
+        assert dfa2 == dfa1
+        for word in ([], [1], [1, 1, 1], [0, 1, 1, 0, 1]):
+            assert dfa2.label(word) == dfa1.label(word)
+            assert dfa2.compile().label(word) == dfa1.label(word)
+
+        dfa3 = load(f"{path}/dfa1.bin", mmap=False)
+        assert not isinstance(dfa3.compile().table, np.memmap)
+        assert dfa3 == dfa1
+
+
+def test_save_load_moore():
+    dfa_dict = {
+        'a': ((1, 'x'), {('l', 0): 'b', 'r': 'a'}),
+        'b': (None, {('l', 0): 'a', 'r': 'c'}),
+        'c': (3, {('l', 0): 'c', 'r': 'c'}),
+    }
+    dfa1 = dict2dfa(dfa_dict, start='a')
+    with TemporaryDirectory() as path:
+        save(dfa1.compile(), f"{path}/dfa1.bin")
+        compiled = load_compiled(f"{path}/dfa1.bin")
+        assert compiled.inputs == dfa1.compile().inputs
+        assert compiled.outputs == dfa1.outputs
+        for word in ([], ['r'], [('l', 0)], [('l', 0), 'r', 'r']):
+            assert compiled.label(word) == dfa1.label(word)
+
+
+def test_load_bad_file():
+    with TemporaryDirectory() as path:
+        with open(f"{path}/bad.bin", 'wb') as f:
+            f.write(b'not a dfa')
+        with pytest.raises(ValueError):
+            load(f"{path}/bad.bin")
+
+
+def test_load_nonzero_start():
+    parity = DFA(
+        start=0,
+        inputs={0, 1},
+        label=lambda s: s == 0,
+        transition=lambda s, c: (s + c) % 2,
+    )
+    odd = ~parity
+    with TemporaryDirectory() as path:
+        save(attr.evolve(parity.compile(), start=1), f"{path}/odd.bin")
+        loaded = load(f"{path}/odd.bin")
+    assert loaded.start == 1
+    assert not loaded.label([])
+    assert not loaded.minimize().label([])
+    assert loaded == odd
+    assert hash(loaded) == hash(odd)
+    assert loaded.to_int() == odd.to_int()
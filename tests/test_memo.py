@@ -0,0 +1,65 @@
+from dfa import DFA
+from dfa.memo import cache_size, cache_stats, memoize, with_cache_size
+
+from common import count_mod
+
+
+def test_unbounded_by_default():
+    dfa = count_mod()
+    dfa.label([1] * 8)
+    stats = cache_stats(dfa).transition
+    assert stats.maxsize is None
+    assert (stats.misses, stats.hits, stats.evictions) == (4, 4, 0)
+
+
+def test_lru_policy():
+    with cache_size(2):
+        dfa = count_mod()
+    assert count_mod()._transition.cache_info().maxsize is None
+
+    dfa.label([1] * 8)
+    stats = cache_stats(dfa).transition
+    assert stats.maxsize == 2
+    assert stats.currsize == 2
+    assert stats.misses == 8
+    assert stats.evictions == 6
+
+
+def test_no_cache_policy():
+    dfa = with_cache_size(count_mod(), 0)
+    dfa.label([1] * 8)
+    stats = cache_stats(dfa).transition
+    assert (stats.misses, stats.hits, stats.currsize) == (8, 0, 0)
+
+
+def test_shared_caches():
+    dfa = count_mod()
+    dfa.label([1] * 4)
+    assert dfa.advance([1])._transition is dfa._transition
+    assert (~dfa)._transition is dfa._transition
+
+    neg = ~dfa
+    neg.label([1] * 4)
+    assert cache_stats(dfa).label.hits == 1
+    assert cache_stats(neg).label.currsize == 0
+
+
+def test_memoize_user_cache():
+    transition = memoize(lambda s, c: (s + c) % 4, maxsize=16)
+    dfa = DFA(start=0, inputs={0, 1}, label=lambda s: s == 3,
+              transition=transition)
+    assert dfa._transition is transition
+
+
+def test_sink_cache_bounded():
+    with cache_size(16):
+        dfa = count_mod(1000)
+    for _ in range(20):
+        dfa = dfa.advance([0, 1] * 1000)
+    assert dfa._transition.cache_info().currsize == 16
+    assert dfa._sinks.cache_info().currsize == 16
+    assert dfa._sinks.cache_info().maxsize == 16
+
+    implicit = DFA(start=0, label=bool, transition=lambda s, c: s)
+    assert implicit.label([1, 2, 3]) is False
+    assert implicit._sinks is None
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from dfa import DFA
+from dfa.monitor import MonitorPool
+
+
+def count_to3():
+    return DFA(
+        start=0,
+        inputs={0, 1},
+        label=lambda s: s >= 2,
+        transition=lambda s, c: min(s + c, 3),
+    )
+
+
+def test_monitor_pool():
+    dfa = count_to3()
+    pool = MonitorPool(dfa, capacity=2)
+    a, b, c = pool.add(), pool.add(), pool.add(start=2)  # Grows.
+    assert len(pool) == 3
+    assert pool.labels().tolist() == [False, False, True]
+
+    step = pool.step([1, 0, 1])
+    assert step.changed.tolist() == []
+    assert step.absorbed.tolist() == [c]
+
+    step = pool.step([1, 1], sessions=[a, b])
+    assert step.changed.tolist() == [a]
+    assert [pool.state(s) for s in (a, b, c)] == [2, 1, 3]
+
+    pool.remove(a)
+    assert a not in pool and len(pool) == 3 - 1
+    with pytest.raises(KeyError):
+        pool.step([1], sessions=[a])
+    assert pool.add() == a  # Ids are reused.
+    assert pool.state(a) == 0
+
+
+def test_monitor_pool_matches_run():
+    dfa = count_to3()
+    rng = random.Random(0)
+    pool = MonitorPool(dfa)
+    words = {pool.add(): [] for _ in range(100)}
+    for _ in range(5):
+        letters = [rng.choice([0, 1]) for _ in words]
+        for word, letter in zip(words.values(), letters):
+            word.append(letter)
+        pool.step(letters, sessions=list(words))
+    assert pool.labels(list(words)).tolist() \
+        == [dfa.label(w) for w in words.values()]
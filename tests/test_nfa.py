@@ -0,0 +1,59 @@
+from itertools import product
+
+from dfa import DFA
+from dfa.nfa import NFA, members
+
+
+def nth_from_last(n):
+    """Words over {a, b} whose n-th letter from the end is an a."""
+    return NFA(
+        starts={0},
+        inputs='ab',
+        transition=lambda s, c: {0, 1} if (s, c) == (0, 'a') else
+        ({0} if s == 0 else ({s + 1} if s < n else ())),
+        accepting=lambda s: s == n,
+    )
+
+
+def test_subset_construction():
+    n = 4
+    dfa = nth_from_last(n).to_dfa()
+    for length in range(7):
+        for word in product('ab', repeat=length):
+            assert dfa.label(word) == (length >= n and word[-n] == 'a')
+    assert len(dfa.states()) == 2**n
+    assert len(dfa.minimize().states()) == 2**n
+
+
+def test_lazy_expansion():
+    nfa = nth_from_last(30)
+    dfa = nfa.to_dfa()
+    assert dfa.label('a' + 'b' * 29)
+    assert not dfa.label('b' * 40)
+    assert len(nfa._states) == 31  # Only reached states are indexed.
+    assert len(nfa._subsets) <= 1 + 40 + 30
+
+
+def test_epsilon_moves():
+    # Accepts a* | b* via epsilon moves from a fresh start state.
+    nfa = NFA(
+        starts={'init'},
+        inputs='ab',
+        transition=lambda s, c: {s} if s == c else (),
+        accepting=lambda s: s != 'init',
+        epsilon=lambda s: {'a', 'b'} if s == 'init' else (),
+    )
+    dfa = nfa.to_dfa()
+    assert nfa.decode(dfa.start) == {'init', 'a', 'b'}
+    assert dfa.label('') and dfa.label('aaa') and dfa.label('bb')
+    assert not dfa.label('ab') and not dfa.label('ba')
+
+    only_a = DFA(start=True, inputs='ab', label=lambda s: s,
+                 transition=lambda s, c: s and c == 'a')
+    assert (dfa & only_a) == only_a
+    assert len(dfa.minimize().states()) == 4
+
+
+def test_members():
+    assert list(members(0b101001)) == [0, 3, 5]
+    assert list(members(0)) == []
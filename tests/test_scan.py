@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+from dfa import DFA
+from dfa.scan import ByteScanner, scan, scan_file
+
+
+def contains(pattern: bytes, inputs=range(256)):
+    """Accepts byte strings containing pattern (KMP style automaton)."""
+    def transition(s, c):
+        if s == len(pattern):
+            return s
+        while True:
+            if pattern[s] == c:
+                return s + 1
+            if s == 0:
+                return 0
+            s = max(k for k in range(s) if pattern[:k] == pattern[s - k:s])
+
+    return DFA(
+        start=0,
+        inputs=inputs,
+        label=lambda s: s == len(pattern),
+        transition=transition,
+    )
+
+
+def test_scan_chunks():
+    dfa = contains(b'abab')
+    rng = random.Random(0)
+    data = bytes(rng.choice(b'abc') for _ in range(200)) + b'abab' + b'c'
+    expected = next(i for i in range(len(data) + 1)
+                    if dfa.label(data[:i + 1]))
+
+    for chunk_size in (1, 3, 64, len(data)):
+        scanner = ByteScanner(dfa)
+        buffer = memoryview(bytearray(data))
+        for pos in range(0, len(data), chunk_size):
+            scanner.feed(buffer[pos:pos + chunk_size])
+        assert scanner.first_change == expected
+        assert scanner.label and scanner.absorbed
+        assert scanner.offset == len(data)
+
+
+def test_scan_matches_trace():
+    dfa = DFA(
+        start=0,
+        inputs=[bytes([b]) for b in b'ab'],
+        label=lambda s: s % 3,
+        outputs={0, 1, 2},
+        transition=lambda s, c: (s + (c == b'a') + 2 * (c == b'b')) % 3,
+    )
+    word = b'abbaabba'
+    scanner = scan(dfa, word)
+    letters = [bytes([b]) for b in word]
+    assert scanner.state == dfa.transition(letters)
+    changes = [i for i, s in enumerate(dfa.trace(letters)) if dfa._label(s)]
+    assert scanner.first_change == changes[0] - 1
+
+
+def test_scan_errors():
+    dfa = contains(b'a', inputs=b'ab')
+    with pytest.raises(ValueError):
+        ByteScanner(DFA(start=0, inputs={256}, label=bool,
+                        transition=lambda s, c: s))
+    with pytest.raises(ValueError):
+        scan(DFA(start=0, inputs={b'a'}, label=bool,
+                 transition=lambda s, c: 1 - s), b'ab')
+    # Input after an absorbing state is skipped, even if invalid.
+    assert scan(dfa, b'bazzz').first_change == 1
+
+
+def test_scan_reset():
+    dfa = contains(b'ab', inputs=b'abc')
+    scanner = ByteScanner(dfa)
+    table = scanner._current
+    assert table.itemsize == 4  # Flat int32 table with an error state.
+    assert len(table) == 256 * (len(dfa.states()) + 1)
+    assert scanner.feed(b'cab') == 2
+
+    scanner.reset()
+    assert scanner._current is table  # Same initial label. No rebuild.
+    assert scanner.feed(b'aab') == 2
+
+    scanner.reset(start=2)  # Accepting, so the label never changes.
+    assert scanner.label and scanner.absorbed
+    assert scanner.feed(b'cc') is None
+
+    dfa = DFA(start=0, inputs=b'ab', label=lambda s: s, outputs={0, 1},
+              transition=lambda s, c: 1 - s if c == ord('a') else s)
+    scanner = ByteScanner(dfa, start=1)
+    assert scanner.feed(b'bba') == 2
+    scanner.reset()
+    assert scanner.label == 0 and scanner.feed(b'ba') == 1
+
+
+def test_scan_file(tmp_path):
+    dfa = contains(b'needle')
+    path = tmp_path / 'haystack'
+    path.write_bytes(b'hay' * 1000 + b'needle' + b'hay' * 10)
+    scanner = scan_file(dfa, path, chunk_size=100)
+    assert scanner.first_change == 3000 + 5
+    assert scanner.label
+
+    path.write_bytes(b'')
+    scanner = scan_file(dfa, path)
+    assert scanner.offset == 0 and scanner.first_change is None
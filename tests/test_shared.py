@@ -0,0 +1,42 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from dfa.shared import attach, share
+
+from common import count_mod
+
+
+def label_in_worker(handle, word):
+    with handle:  # Unpickled handles attach by name.
+        assert not handle.owner
+        dfa_ = handle.dfa()
+        result = dfa_.label(word), len(dfa_.states())
+        del dfa_
+    return result
+
+
+def test_share_and_attach():
+    dfa = count_mod(5)
+    with share(dfa) as handle:
+        assert len(pickle.dumps(handle)) < 100
+        shared = handle.dfa()
+        assert shared == dfa
+        assert shared.compile().table.base is not None  # No copy.
+
+        other = attach(handle.name)
+        assert other.dfa() == dfa
+        other.close()
+        del shared
+
+        with ProcessPoolExecutor(2) as pool:
+            results = list(pool.map(label_in_worker, [handle] * 3,
+                                    [[1] * 4, [1] * 3, []]))
+        assert results == [(True, 5), (False, 5), (False, 5)]
+
+
+def test_share_non_boolean():
+    dfa = count_mod(3, outputs={0, 1, 2})
+    with share(dfa) as handle:
+        shared = handle.dfa()
+        assert [shared.label([1] * i) for i in range(4)] == [0, 1, 2, 0]
+        del shared
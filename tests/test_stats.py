@@ -0,0 +1,58 @@
+from dfa import DFA, dfa2dict
+from dfa import stats
+
+
+def mod3():
+    return DFA(
+        start=0,
+        inputs={0, 1},
+        label=lambda s: s == 0,
+        transition=lambda s, c: (s + c) % 3,
+    )
+
+
+def test_record_counts():
+    existing = mod3()
+    existing.label([1])  # Activity before recording is not counted.
+
+    with stats.record() as recorder:
+        dfa = mod3()
+        assert len(dfa.states()) == 3
+        dfa.minimize()
+        assert dfa == mod3()
+        existing.label([1, 1])
+    snapshot = recorder.snapshot()
+
+    counters = snapshot.counters
+    assert counters['explored_states'] >= 3
+    assert counters['transition.misses'] >= 3 * 2
+    assert counters['transition.calls'] == \
+        counters['transition.hits'] + counters['transition.misses']
+    assert counters['label.calls'] >= 1
+    for name in ('walk', 'minimize', 'eq'):
+        assert snapshot.timers[name].calls >= 1
+        assert snapshot.timers[name].seconds >= 0
+    assert snapshot.timers['walk'].calls < counters['explored_states']
+
+    metrics = snapshot.as_dict()
+    assert metrics['minimize.calls'] == snapshot.timers['minimize'].calls
+
+    # Stopped recorders are frozen.
+    dfa2dict(mod3())
+    assert recorder.snapshot() == snapshot
+
+
+def test_nested_and_disabled():
+    with stats.record() as outer:
+        with stats.record() as inner:
+            dfa2dict(mod3())
+        mod3().to_int()
+    assert inner.snapshot().timers['dfa2dict'].calls == 1
+    assert 'to_int' not in inner.snapshot().timers
+    assert outer.snapshot().timers['to_int'].calls == 1
+    assert outer.snapshot().timers['dfa2dict'].calls >= 1
+
+    assert not stats._recorders
+    recorder = stats.Recorder()  # Not started, so nothing is timed.
+    mod3().minimize()
+    assert recorder.snapshot().timers == {}
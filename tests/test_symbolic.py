@@ -0,0 +1,123 @@
+import hypothesis.strategies as st
+from hypothesis import given
+
+from dfa import DFA
+from dfa.symbolic import TRUE, FALSE, Guard, SymbolicDFA
+from dfa.symbolic import alphabet_classes, atom, atoms
+
+K = 4
+LETTERS = range(1 << K)
+
+
+def members(guard):
+    return {x for x in LETTERS if x in guard}
+
+
+literals = st.builds(
+    lambda i, neg: ~atom(i) if neg else atom(i),
+    st.integers(0, K - 1), st.booleans(),
+)
+guards = st.recursive(
+    literals,
+    lambda children: st.one_of(
+        st.builds(lambda a, b: a & b, children, children),
+        st.builds(lambda a, b: a | b, children, children),
+        st.builds(lambda a: ~a, children),
+    ),
+    max_leaves=6,
+)
+
+
+@given(guards, guards)
+def test_guard_algebra(g1, g2):
+    assert members(g1 & g2) == members(g1) & members(g2)
+    assert members(g1 | g2) == members(g1) | members(g2)
+    assert members(~g1) == set(LETTERS) - members(g1)
+    assert members(g1 - g2) == members(g1) - members(g2)
+    assert g1.count(K) == len(members(g1))  # Cubes are disjoint.
+    if g1:
+        assert g1.witness() == min(members(g1))
+
+
+@given(st.lists(guards, max_size=4))
+def test_alphabet_classes(gs):
+    classes = alphabet_classes(gs)
+    parts = [members(c) for c in classes]
+    assert sum(map(len, parts)) == len(LETTERS)
+    assert set().union(*parts) == set(LETTERS)
+    for part in parts:
+        for guard in gs:
+            assert part <= members(guard) or not (part & members(guard))
+    assert len(alphabet_classes([TRUE, FALSE])) == 1
+
+
+def counter(guard, modulus, accept=0):
+    return SymbolicDFA(
+        start=0,
+        num_atoms=K,
+        label=lambda s: s == accept,
+        transition=lambda s: [(guard, (s + 1) % modulus), (~guard, s)],
+    )
+
+
+def explicit(sdfa):
+    return DFA(
+        start=sdfa.start,
+        inputs=LETTERS,
+        label=sdfa._label,
+        transition=sdfa.step,
+    )
+
+
+@given(guards, guards, st.lists(st.integers(0, (1 << K) - 1), max_size=8))
+def test_symbolic_dfa(g1, g2, word):
+    d1, d2 = counter(g1, 2), counter(g2, 3, accept=1)
+    for sdfa in (d1 & d2, d1 | d2, d1 ^ d2, ~d1):
+        ref = explicit(sdfa)
+        assert sdfa.label(word) == ref.label(word)
+        minimal = sdfa.minimize()
+        assert len(minimal.states()) == len(ref.minimize().states())
+        assert minimal.label(word) == sdfa.label(word)
+        assert minimal == sdfa and hash(minimal) == hash(sdfa)
+        found = sdfa.find_word()
+        assert (found is None) == (ref.find_word() is None)
+        if found is not None:
+            assert ref.label(found)
+
+    assert (d1 == counter(g1 | g2, 2)) == (members(g1) == members(g1 | g2))
+
+
+def test_many_atoms():
+    k = 20
+    a = atoms(k)
+    d1 = SymbolicDFA(start=0, num_atoms=k, label=lambda s: s == 0,
+                     transition=lambda s: [(a[0] & a[1], (s + 1) % 3),
+                                           (~(a[0] & a[1]), s)])
+    d2 = SymbolicDFA(start=0, num_atoms=k, label=lambda s: s == 1,
+                     transition=lambda s: [(a[2] | a[19], 1 - s),
+                                           (~(a[2] | a[19]), s)])
+    product = d1 & d2
+    assert len(product.alphabet_classes()) == 4
+    assert len(product.minimize().states()) == 6
+    assert product != d1
+    assert product.label([1 << 2]) and not product.label([1 << 19, 3])
+    assert isinstance(Guard({(1, 1)}) & TRUE, Guard)
+
+
+def test_hash():
+    def parity(guard):
+        return SymbolicDFA(start=0, num_atoms=2, label=lambda s: s == 1,
+                           transition=lambda s: [(guard, 1 - s),
+                                                 (~guard, s)])
+
+    a = atoms(2)
+    split = Guard({(3, 1), (3, 3)})  # Same letters as a[0].
+    assert parity(a[0]) == parity(split)
+    assert hash(parity(a[0])) == hash(parity(split))
+    # Same number of states and labels, but different languages.
+    guards = (a[0], a[1], a[0] - a[1], a[0] | a[1], TRUE)
+    assert len({hash(parity(g)) for g in guards}) == 5
+
+    sdfa = parity(a[1])
+    assert hash(sdfa) == sdfa._hash == hash(sdfa)
+    assert (~sdfa)._hash is None and hash(~sdfa) != hash(sdfa)
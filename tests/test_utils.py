@@ -1,12 +1,19 @@
+from collections import deque
 from itertools import combinations
 
 import funcy as fn
+import hypothesis.strategies as st
+import pytest
+from hypothesis import given, settings
 
 import dfa
-from dfa.utils import dict2dfa, dfa2dict, paths
+from dfa.utils import dict2dfa, dfa2dict, paths, sample_paths
 from dfa.utils import find_subset_counterexample, find_equiv_counterexample
 from dfa.utils import enumerate_dfas, minimize, words, find_word
 from dfa.utils import min_distance_to_accept_by_state
+from dfa.utils import group_by_language, language_ids
+
+from common import random_dfa
 
 
 def test_dict2dfa():
@@ -181,3 +188,134 @@ def test_min_distance_to_accept_by_state():
     for i in range(4):
         assert distances[i] == 3 - i
     assert distances['fail'] == float('inf')
+
+
+def moore_minimize(orig):
+    """Reference minimization via naive Moore partition refinement."""
+    states = orig.states()
+    inputs = sorted(orig.inputs)
+    cls = {s: orig._label(s) for s in states}
+    while True:
+        sig = {s: (cls[s],) + tuple(cls[orig._transition(s, a)]
+               for a in inputs) for s in states}
+        if len(set(sig.values())) == len(set(cls.values())):
+            break
+        cls = sig
+    dfa_dict = {cls[s]: (orig._label(s), {
+        a: cls[orig._transition(s, a)] for a in inputs
+    }) for s in states}
+    return dict2dfa(dfa_dict, cls[orig.start]).normalize()
+
+
+@settings(max_examples=200)
+@given(st.data())
+def test_minimize_matches_reference(data):
+    k = data.draw(st.integers(1, 3))
+    outputs = data.draw(st.sampled_from([(False, True), ('a', 'b', 'c')]))
+    orig = random_dfa(data, n_max=12, k=k, outputs=outputs)
+    assert dfa2dict(minimize(orig)) == dfa2dict(moore_minimize(orig))
+
+
+def shortest_word(lang):
+    """Reference BFS for a shortest accepted word."""
+    queue, visited = deque([(lang.start, ())]), {lang.start}
+    while queue:
+        state, word = queue.popleft()
+        if lang._label(state):
+            return word
+        for char in sorted(lang.inputs):
+            state2 = lang._transition(state, char)
+            if state2 not in visited:
+                visited.add(state2)
+                queue.append((state2, word + (char,)))
+    return None
+
+
+@settings(max_examples=200)
+@given(st.data())
+def test_counterexamples_are_shortest(data):
+    dfa1, dfa2 = random_dfa(data, n_max=6), random_dfa(data, n_max=6)
+
+    word = find_equiv_counterexample(dfa1, dfa2)
+    expected = shortest_word(dfa1 ^ dfa2)
+    if expected is None:
+        assert word is None
+    else:
+        assert len(word) == len(expected)
+        assert dfa1.label(word) != dfa2.label(word)
+
+    word = find_subset_counterexample(dfa1, dfa2)
+    expected = shortest_word(dfa1 & ~dfa2)
+    if expected is None:
+        assert word is None
+    else:
+        assert len(word) == len(expected)
+        assert dfa1.label(word) and not dfa2.label(word)
+
+
+def test_enumerate_shards():
+    dfas = list(enumerate_dfas('ab', max_states=3))
+    assert len({d.to_int() for d in dfas}) == len(dfas)  # No duplicates.
+    assert all(len(d.states()) == len(d.minimize().states()) for d in dfas)
+
+    shards = [list(enumerate_dfas('ab', shard=i, num_shards=3, max_states=3))
+              for i in range(3)]
+    assert sorted(d.to_int() for shard in shards for d in shard) \
+        == sorted(d.to_int() for d in dfas)
+
+    # Minimal DFAs over a single letter: 2 with one state, 4 with two.
+    assert len(list(enumerate_dfas('a', max_states=2))) == 6
+
+
+def test_sample_paths():
+    import random
+
+    dfa_ = dfa.DFA(
+        start=0,
+        inputs={0, 1},
+        label=lambda s: (s % 4) == 3,
+        transition=lambda s, c: (s + c) % 4,
+    )
+    all_paths = set(paths(dfa_, start=0, end=1, max_length=5))
+    samples = sample_paths(dfa_, start=0, end=1, max_length=5,
+                           num_samples=2000, rng=random.Random(0))
+    assert set(samples) == all_paths
+    assert samples == sample_paths(dfa_, start=0, end=1, max_length=5,
+                                   num_samples=2000, rng=0)
+
+    # Uniform over all 2^0 + ... + 2^3 = 15 paths.
+    samples = sample_paths(dfa_, start=2, max_length=3, num_samples=15000,
+                           rng=1)
+    counts = fn.count_by(len, samples)
+    assert {len(w) for w in samples} == {0, 1, 2, 3}
+    assert 0.9 < counts[3] / 8000 < 1.1
+
+    # States unreachable from the DFA's own start.
+    chain = dfa.DFA(
+        start=0,
+        inputs={0, 1},
+        label=lambda s: s == 2,
+        transition=lambda s, c: min(s + c, 3) if s else 0,
+    )
+    expected = set(paths(chain, start=1, end=2, max_length=3))
+    assert len(expected) == 6  # Words with a single 1.
+    samples = sample_paths(chain, start=1, end=2, max_length=3,
+                           num_samples=300, rng=0)
+    assert set(samples) == expected
+    with pytest.raises(ValueError):
+        sample_paths(chain, start=2, end=1, max_length=3)
+
+
+def test_language_ids():
+    dfas = list(enumerate_dfas('ab', max_states=2))
+    dfas += [d.advance('a') for d in dfas]  # Equivalent to earlier ones.
+    dfas += list(enumerate_dfas('a', max_states=2))  # Other alphabet.
+    ids = language_ids(dfas)
+    for (i, d1), (j, d2) in combinations(enumerate(dfas), 2):
+        assert (ids[i] == ids[j]) == (d1 == d2)
+    assert ids[0] == 0 and max(ids) + 1 == len(set(ids))
+
+    assert language_ids(dfas, processes=2) == ids
+    classes = group_by_language(dfas)
+    assert sorted(i for c in classes for i in c) == list(range(len(dfas)))
+    assert all(len({ids[i] for i in c}) == 1 for c in classes)